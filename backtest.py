@@ -0,0 +1,294 @@
+# backtest.py
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import screener
+from candle_store import FIELDS
+from kline_archive import KlineArchive
+from signal_rules import (criteria_masks, volume_too_low, take_profit_stop_loss, position_size,
+                          potential_loss, MAX_LOSS)
+
+WINDOW = 50             # wie get_candles(limit=50) in analyze_symbol: erstes Signal frühestens hier
+SYMBOL_CHUNK = 512      # so viele Symbole laufen gemeinsam Kerze für Kerze durch die Historie
+TIME_BLOCK = 4096       # so viele Kerzen pro Symbol werden auf einmal in den Block kopiert
+EXIT_HORIZON = 288      # TP/SL-Suche in Blöcken von 288 Kerzen (1 Tag bei 5m)
+FEE_RATE = float(os.getenv("BACKTEST_FEE_RATE", "0"))   # pro Seite, z. B. 0.0004 für Taker
+
+TRADE_COLUMNS = ["symbol", "direction", "entry_idx", "exit_idx", "entry_time", "exit_time",
+                 "entry", "tp", "sl", "exit", "reason", "qty", "risk", "pnl"]
+
+
+def load_candles(path):
+    """
+    Kerzen aus einer CSV-Datei (timestamp, open, high, low, close, volume, weitere Spalten egal;
+    auch das Binance-Downloadformat ohne Header) als Array 6 × Kerzen, nach Zeit sortiert.
+    """
+    df = pd.read_csv(path, header=None, usecols=range(6))
+    df = df[pd.to_numeric(df[0], errors="coerce").notna()]     # Kopfzeile überspringen
+    candles = df.to_numpy(dtype=np.float64).T
+    order = np.argsort(candles[0], kind="stable")
+    return np.ascontiguousarray(candles[:, order])
+
+
+def load_directory(path):
+    # Eine Datei pro Symbol: <SYMBOL>.csv
+    return {name[:-4]: load_candles(os.path.join(path, name))
+            for name in sorted(os.listdir(path)) if name.endswith(".csv")}
+
+
+def load_archive(root=None, interval="5m", start=None, end=None):
+    # Memory-gemappte Kerzen aller Symbole aus dem Kline-Archiv (keine Kopie im Speicher)
+    archive = KlineArchive(root) if root else KlineArchive()
+    return {symbol: archive.read(symbol, interval, start, end) for symbol in archive.symbols(interval)}
+
+
+def indicator_paths(data):
+    """
+    Indikatorwerte jeder Kerze mit dem Zustand über die gesamte Historie – so, wie die
+    IndicatorEngine im laufenden Bot (bzw. der ScreenerState) ihn über die Zyklen fortschreibt:
+    Kerze i wird als letzte Kerze ausgewertet und danach als abgeschlossen eingerechnet.
+    Alle Symbole eines Blocks laufen gemeinsam Schritt für Schritt durch die Zeit.
+    Rückgabe: {Symbol: {Indikator: Array mit einem Wert pro Kerze}}
+    """
+    result = {}
+    items = list(data.items())
+    for first in range(0, len(items), SYMBOL_CHUNK):
+        chunk = items[first:first + SYMBOL_CHUNK]
+        lengths = np.array([candles.shape[1] for _, candles in chunk])
+        state = screener.ScreenerState()
+        rows = state.index([symbol for symbol, _ in chunk])
+        paths = None
+        for offset in range(0, int(lengths.max(initial=0)), TIME_BLOCK):
+            width = min(TIME_BLOCK, int(lengths.max()) - offset)
+            block = np.full((len(FIELDS), len(chunk), width), np.nan)
+            for i, (_, candles) in enumerate(chunk):
+                part = candles[:, offset:offset + width]
+                block[:, i, :part.shape[1]] = part
+            for j in range(width):
+                active = lengths > offset + j
+                column = block[:, active, j]
+                values = state.snapshot(rows[active], *column[2:])
+                if paths is None:
+                    paths = {key: np.full((len(chunk), int(lengths.max())), np.nan) for key in values}
+                for key, value in values.items():
+                    paths[key][active, offset + j] = value
+                state.update(rows[active], column[0], *column[2:])
+        for i, (symbol, _) in enumerate(chunk):
+            result[symbol] = {key: path[i, :lengths[i]] for key, path in (paths or {}).items()}
+    return result
+
+
+def signal_masks(candles, values, window=WINDOW):
+    """
+    Wendet die Regeln des Bots auf die Indikatorwerte jeder Kerze an.
+    Rückgabe: (long-Maske, short-Maske) mit einem Eintrag pro Kerze.
+    """
+    args = (values["rsi"], values["ema20"], values["ema50"], values["macd_line"], values["macd_signal"])
+    # Wie im Bot erst mit voller Fensterhistorie; davor sind EMA50 und MACD-Signal noch NaN
+    enough = np.arange(candles.shape[1]) >= window - 1
+    ok = enough & ~volume_too_low(candles[5], values["avg_volume"])
+    long_ok = ok & ~np.logical_or.reduce(criteria_masks("long", *args))
+    short_ok = ok & ~np.logical_or.reduce(criteria_masks("short", *args))
+    return long_ok, short_ok
+
+
+def first_exits(high, low, close, entries, tp, sl, is_long):
+    """
+    Erste Kerze nach dem Einstieg, in der TP oder SL erreicht wird – für alle Einstiege einer
+    Richtung gleichzeitig, blockweise vorwärts. Treffen beide in derselben Kerze, zählt der SL.
+    Ohne Treffer wird zum letzten Schlusskurs geschlossen.
+    """
+    n = len(close)
+    exit_idx = np.full(len(entries), n - 1)
+    exit_price = np.full(len(entries), close[-1])
+    reason = np.full(len(entries), "offen", dtype=object)
+    todo = np.arange(len(entries))
+    offset = 1
+    while len(todo) and offset < n:
+        idx = entries[todo, None] + offset + np.arange(EXIT_HORIZON)
+        valid = idx < n
+        idx = np.minimum(idx, n - 1)
+        if is_long:
+            hit_sl = (low[idx] <= sl[todo, None]) & valid
+            hit_tp = (high[idx] >= tp[todo, None]) & valid
+        else:
+            hit_sl = (high[idx] >= sl[todo, None]) & valid
+            hit_tp = (low[idx] <= tp[todo, None]) & valid
+        hit = hit_sl | hit_tp
+        found = hit.any(axis=1)
+        first = hit.argmax(axis=1)
+        rows = todo[found]
+        cols = first[found]
+        exit_idx[rows] = idx[found, cols]
+        stopped = hit_sl[found, cols]
+        exit_price[rows] = np.where(stopped, sl[rows], tp[rows])
+        reason[rows] = np.where(stopped, "SL", "TP")
+        todo = todo[~found & valid[:, -1]]
+        offset += EXIT_HORIZON
+    return exit_idx, exit_price, reason
+
+
+def symbol_trades(symbol, candles, values, window=WINDOW):
+    """
+    Alle möglichen Trades eines Symbols: Einstieg zum Schlusskurs jeder Signal-Kerze,
+    TP/SL wie im Bot. Ob ein Trade wirklich eröffnet wird, entscheidet run_backtest.
+    values: Indikatorwerte pro Kerze aus indicator_paths.
+    """
+    if candles.shape[1] < window + 1:
+        return pd.DataFrame(columns=TRADE_COLUMNS)
+    timestamp, _, high, low, close, _ = candles
+    long_ok, short_ok = signal_masks(candles, values, window)
+
+    frames = []
+    for direction, ok in (("long", long_ok), ("short", short_ok)):
+        entries = np.flatnonzero(ok)
+        if not len(entries):
+            continue
+        price = close[entries]
+        tp, sl = take_profit_stop_loss(direction, price, values["atr"][entries])
+        exit_idx, exit_price, reason = first_exits(high, low, close, entries, tp, sl, direction == "long")
+        qty = position_size(price)
+        sign = 1.0 if direction == "long" else -1.0
+        pnl = sign * (exit_price - price) * qty - FEE_RATE * (price + exit_price) * qty
+        frames.append(pd.DataFrame({
+            "symbol": symbol,
+            "direction": direction.upper(),
+            "entry_idx": entries,
+            "exit_idx": exit_idx,
+            "entry_time": timestamp[entries].astype(np.int64),
+            "exit_time": timestamp[exit_idx].astype(np.int64),
+            "entry": price,
+            "tp": tp,
+            "sl": sl,
+            "exit": exit_price,
+            "reason": reason,
+            "qty": qty,
+            "risk": potential_loss(tp, sl, qty),
+            "pnl": pnl,
+        }))
+    if not frames:
+        return pd.DataFrame(columns=TRADE_COLUMNS)
+    return pd.concat(frames, ignore_index=True)
+
+
+def run_backtest(data, max_loss=MAX_LOSS, workers=None):
+    """
+    data: {Symbol: Kerzen 6 × n}. Spielt alle Signale chronologisch ab: pro Symbol höchstens
+    eine offene Position, und wie in place_order wird der potenzielle Verlust jeder Order auf
+    capital_lost addiert – ab max_loss (None = ohne Grenze) werden keine Orders mehr eröffnet.
+    Rückgabe: (ausgeführte Trades, Auswertung pro Symbol, Gesamtauswertung)
+    """
+    paths = indicator_paths(data)
+    # Symbole sind unabhängig; NumPy gibt bei den grossen Operationen den GIL frei
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        frames = list(pool.map(lambda item: symbol_trades(item[0], item[1], paths[item[0]]), data.items()))
+    if frames:
+        candidates = pd.concat(frames, ignore_index=True)
+    else:
+        candidates = pd.DataFrame(columns=TRADE_COLUMNS)
+    candidates = candidates.sort_values(["entry_time", "symbol"], kind="stable")
+
+    capital_lost = 0.0
+    busy_until = {}
+    taken = []
+    blocked = 0
+    rows = zip(candidates.index, candidates["symbol"], candidates["entry_time"],
+               candidates["exit_time"], candidates["risk"])
+    for index, symbol, entry_time, exit_time, risk in rows:
+        if entry_time < busy_until.get(symbol, -1):
+            continue
+        if max_loss is not None and capital_lost + risk >= max_loss:
+            blocked += 1
+            continue
+        capital_lost += risk
+        busy_until[symbol] = exit_time
+        taken.append(index)
+
+    trades = candidates.loc[taken].reset_index(drop=True)
+    return trades, summarize_symbols(trades), summarize(trades, len(candidates), blocked, capital_lost)
+
+
+def summarize_symbols(trades):
+    if trades.empty:
+        return pd.DataFrame(columns=["trades", "wins", "win_rate", "pnl", "avg_pnl", "max_drawdown"])
+    grouped = trades.groupby("symbol")["pnl"]
+    summary = pd.DataFrame({
+        "trades": grouped.size(),
+        "wins": grouped.apply(lambda pnl: int((pnl > 0).sum())),
+        "pnl": grouped.sum(),
+        "avg_pnl": grouped.mean(),
+        "max_drawdown": grouped.apply(lambda pnl: max_drawdown(pnl.to_numpy())),
+    })
+    summary["win_rate"] = summary["wins"] / summary["trades"]
+    return summary[["trades", "wins", "win_rate", "pnl", "avg_pnl", "max_drawdown"]].sort_values("pnl")
+
+
+def max_drawdown(pnl):
+    equity = np.cumsum(pnl)
+    return float(np.max(np.maximum.accumulate(np.maximum(equity, 0)) - equity, initial=0.0))
+
+
+def summarize(trades, signals, blocked, capital_lost):
+    pnl = trades.sort_values("exit_time")["pnl"].to_numpy() if len(trades) else np.array([])
+    return {
+        "signals": int(signals),
+        "trades": int(len(trades)),
+        "blocked_by_max_loss": int(blocked),
+        "capital_lost": round(capital_lost, 4),
+        "wins": int((pnl > 0).sum()),
+        "win_rate": round(float((pnl > 0).mean()), 4) if len(pnl) else 0.0,
+        "tp": int((trades["reason"] == "TP").sum()) if len(trades) else 0,
+        "sl": int((trades["reason"] == "SL").sum()) if len(trades) else 0,
+        "open": int((trades["reason"] == "offen").sum()) if len(trades) else 0,
+        "pnl": round(float(pnl.sum()), 4),
+        "max_drawdown": round(max_drawdown(pnl), 4),
+    }
+
+
+def synthetic_data(symbols=300, bars=30 * 288, seed=7):
+    # Zufalls-Kerzen (Random Walk) für einen Lauf ohne lokale Daten
+    rng = np.random.default_rng(seed)
+    timestamp = np.arange(bars, dtype=np.float64) * 300_000
+    data = {}
+    for i in range(symbols):
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.004, bars)))
+        open_ = np.concatenate(([close[0]], close[:-1]))
+        data[f"SYM{i:03d}USDT"] = np.stack([
+            timestamp,
+            open_,
+            np.maximum(open_, close) * (1 + rng.uniform(0, 0.003, bars)),
+            np.minimum(open_, close) * (1 - rng.uniform(0, 0.003, bars)),
+            close,
+            rng.uniform(1, 100, bars),
+        ])
+    return data
+
+
+if __name__ == "__main__":
+    # python backtest.py [Verzeichnis mit <SYMBOL>.csv] [--no-limit]
+    # python backtest.py --archive [Archiv-Verzeichnis]
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    start = time.perf_counter()
+    if "--archive" in sys.argv:
+        data = load_archive(args[0] if args else None)
+        args = args or ["archive"]
+    else:
+        data = load_directory(args[0]) if args else synthetic_data()
+    load_time = time.perf_counter() - start
+    bars = sum(candles.shape[1] for candles in data.values())
+    print(f"📂 {len(data)} Symbole, {bars} Kerzen ({', '.join(FIELDS)}) in {load_time:.1f}s geladen"
+          + ("" if args else " (synthetisch)"))
+
+    start = time.perf_counter()
+    trades, per_symbol, total = run_backtest(data, None if "--no-limit" in sys.argv else MAX_LOSS)
+    elapsed = time.perf_counter() - start
+
+    if not per_symbol.empty:
+        print(per_symbol.round(4).to_string())
+    print(f"📊 {total}")
+    print(f"⏱️ Backtest in {elapsed:.1f}s")
@@ -0,0 +1,343 @@
+# benchmark.py
+# Misst run_bot, analyze_symbol, get_market_trend und update_future_prices gegen einen lokalen
+# Stand-in für fapi.binance.com und Telegram (synthetische Kerzen, einstellbare Latenz).
+#
+#   python benchmark.py [--symbols 50,300,1000] [--latency 0.02] [--out ergebnis.json]
+#
+# Jede Universumsgrösse läuft in einem eigenen Prozess (frischer Bot-Zustand, eigener Peak-RSS);
+# die Ergebnisse landen als JSON in bench_results/ und lassen sich über Commits vergleichen.
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import numpy as np
+
+from candle_store import INTERVAL_MS
+from rate_limiter import kline_weight
+
+try:
+    import resource     # nur Unix
+except ImportError:
+    resource = None
+
+SIZES = [50, 300, 1000]
+RESULTS_DIR = os.getenv("BENCH_RESULTS_DIR", "bench_results")
+HISTORY_BARS = 3000         # synthetische Kerzen pro Symbol und Intervall
+ANALYZE_SAMPLE = 20         # so viele Symbole misst die Stufe analyze_symbol einzeln
+
+# Request-Weight pro Endpunkt (klines hängt vom limit ab)
+ENDPOINT_WEIGHTS = {"/fapi/v1/exchangeInfo": 1, "/fapi/v1/ticker/24hr": 40}
+
+
+class BinanceStandIn:
+    """
+    Lokaler HTTP-Server mit den Endpunkten, die der Bot benutzt: exchangeInfo, klines
+    (auch mit startTime/endTime), ticker/24hr und Telegram sendMessage.
+    Zählt Requests und Request-Weight; jede Antwort wird um `latency` Sekunden verzögert.
+    """
+
+    def __init__(self, symbols, latency=0.0):
+        self.symbols = list(symbols)
+        self.latency = latency
+        self.requests = 0
+        self.weight = 0
+        self.telegram = 0
+        self.by_path = {}
+        self._lock = threading.Lock()
+        self._series = {}
+        self._now_ms = int(time.time() * 1000)
+        self._server = None
+
+    def snapshot(self):
+        with self._lock:
+            return {"requests": self.requests, "weight": self.weight, "telegram": self.telegram,
+                    "by_path": dict(self.by_path)}
+
+    def _count(self, path, weight):
+        with self._lock:
+            self.requests += 1
+            self.weight += weight
+            self.by_path[path] = self.by_path.get(path, 0) + 1
+
+    def series(self, symbol, interval):
+        # Deterministischer Random Walk pro Symbol; letzte Kerze = laufende Kerze beim Start
+        key = (symbol, interval)
+        with self._lock:
+            data = self._series.get(key)
+        if data is None:
+            step = INTERVAL_MS[interval]
+            rng = np.random.default_rng(zlib.crc32(f"{symbol}:{interval}".encode()))
+            last_open = self._now_ms // step * step
+            timestamps = last_open - step * np.arange(HISTORY_BARS - 1, -1, -1, dtype=np.int64)
+            close = 100 * np.exp(np.cumsum(rng.normal(0, 0.004, HISTORY_BARS)))
+            open_ = np.concatenate(([close[0]], close[:-1]))
+            high = np.maximum(open_, close) * (1 + rng.uniform(0, 0.002, HISTORY_BARS))
+            low = np.minimum(open_, close) * (1 - rng.uniform(0, 0.002, HISTORY_BARS))
+            volume = rng.uniform(10, 1000, HISTORY_BARS)
+            data = (timestamps, np.stack([open_, high, low, close, volume], axis=1))
+            with self._lock:
+                self._series[key] = data
+        return data
+
+    def klines(self, query):
+        symbol, interval = query["symbol"], query.get("interval", "5m")
+        limit = min(int(query.get("limit", 500)), 1500)
+        timestamps, values = self.series(symbol, interval)
+        if "startTime" in query:
+            lo = int(np.searchsorted(timestamps, int(query["startTime"]), side="left"))
+            hi = int(np.searchsorted(timestamps, int(query.get("endTime", timestamps[-1])), side="right"))
+            hi = min(hi, lo + limit)
+        else:
+            hi = len(timestamps)
+            lo = max(0, hi - limit)
+        step = INTERVAL_MS[interval]
+        return [[int(ts), *[f"{v:.6f}" for v in row], int(ts) + step - 1, "0", 0, "0", "0", "0"]
+                for ts, row in zip(timestamps[lo:hi], values[lo:hi])]
+
+    def exchange_info(self):
+        return {"symbols": [{
+            "symbol": symbol, "contractType": "PERPETUAL", "quoteAsset": "USDT", "status": "TRADING",
+            "filters": [
+                {"filterType": "PRICE_FILTER", "tickSize": "0.0001"},
+                {"filterType": "LOT_SIZE", "stepSize": "0.001", "minQty": "0.001"},
+                {"filterType": "MIN_NOTIONAL", "notional": "5"},
+            ]} for symbol in self.symbols]}
+
+    def tickers(self):
+        result = []
+        for symbol in self.symbols:
+            _, values = self.series(symbol, "5m")
+            close = values[:, 3]
+            result.append({"symbol": symbol,
+                           "priceChangePercent": f"{(close[-1] / close[-289] - 1) * 100:.3f}",
+                           "quoteVolume": f"{values[-288:, 4].sum() * close[-1]:.2f}"})
+        return result
+
+    def handle(self, method, url):
+        parsed = urlparse(url)
+        query = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+        path = parsed.path
+        if path.endswith("/sendMessage"):
+            with self._lock:
+                self.telegram += 1
+            return 200, {"ok": True}
+        if path == "/fapi/v1/klines":
+            self._count(path, kline_weight(int(query.get("limit", 500))))
+            return 200, self.klines(query)
+        if path == "/fapi/v1/exchangeInfo":
+            self._count(path, ENDPOINT_WEIGHTS[path])
+            return 200, self.exchange_info()
+        if path == "/fapi/v1/ticker/24hr":
+            self._count(path, ENDPOINT_WEIGHTS[path])
+            return 200, self.tickers()
+        self._count(path, 1)
+        return 404, {"code": -1, "msg": f"{method} {path} nicht simuliert"}
+
+    def start(self):
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"   # Keep-Alive wie bei Binance
+
+            def _respond(self, method):
+                length = int(self.headers.get("Content-Length") or 0)
+                if length:
+                    self.rfile.read(length)
+                if stand_in.latency:
+                    time.sleep(stand_in.latency)
+                status, payload = stand_in.handle(method, self.path)
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                self._respond("GET")
+
+            def do_POST(self):
+                self._respond("POST")
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="stand-in", daemon=True).start()
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)  # Linux: KB
+
+
+def run_worker(size, latency, out_path):
+    """
+    Ein Benchmark-Lauf in diesem Prozess: Stand-in starten, main gegen ihn importieren,
+    Stufen messen, Ergebnis nach out_path schreiben.
+    """
+    symbols = ["BTCUSDT"] + [f"S{i:04d}USDT" for i in range(size - 1)]
+    stand_in = BinanceStandIn(symbols, latency)
+    for symbol in symbols:
+        # Synthetische Reihen vorab erzeugen, damit sie nicht in die Messung fallen
+        stand_in.series(symbol, "5m")
+        stand_in.series(symbol, "1m")
+    base_url = stand_in.start()
+    os.environ.update({
+        "BINANCE_REST_URL": base_url,
+        "TELEGRAM_API_URL": base_url,
+        "TELEGRAM_TOKEN": "bench",
+        "CHAT_ID": "1",
+        "ML_DB_PATH": os.path.join(os.getcwd(), "ml_log.db"),
+        "BINANCE_WEIGHT_BUDGET": os.getenv("BINANCE_WEIGHT_BUDGET", str(10 ** 9)),
+        "LOG_LEVEL": os.getenv("LOG_LEVEL", "WARNING"),
+    })
+
+    stages = []
+
+    def measure(name, func, calls=1):
+        before = stand_in.snapshot()
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        after = stand_in.snapshot()
+        stages.append({
+            "stage": name,
+            "seconds": round(elapsed, 4),
+            "seconds_per_call": round(elapsed / calls, 6),
+            "requests": after["requests"] - before["requests"],
+            "weight": after["weight"] - before["weight"],
+            "peak_rss_mb": peak_rss_mb(),
+        })
+
+    start = time.perf_counter()
+    import main     # pylint: disable=import-outside-toplevel
+    import_seconds = time.perf_counter() - start
+    main.bot_active = False     # keine Orders – gemessen wird der Scan
+
+    measure("exchange_info", main.exchange_meta.symbols)
+    universe = main.exchange_meta.symbols()
+
+    def market_trend():
+        main.clear_kline_cache()
+        main.get_market_trend(main.client, universe)
+
+    sample = universe[:ANALYZE_SAMPLE]
+
+    def analyze():
+        main.clear_kline_cache()
+        for symbol in sample:
+            main.analyze_symbol(symbol)
+
+    def run_cycle(screener):
+        def cycle():
+            main.USE_SCREENER = screener
+            main.run_bot()
+        return cycle
+
+    def future_prices():
+        # Eine offene ML-Zeile pro Symbol, alt genug für die Zielkerze
+        ts = (datetime.now() - timedelta(minutes=15)).strftime("%Y-%m-%d %H:%M:%S")
+        main.feature_store.append([[ts, symbol, "LONG", 30, 1, 1, 0.1, 1, 0.5, "neutral", 0, 0, 0, 100.0,
+                                    None, None] for symbol in universe])
+        main.update_future_prices()
+
+    measure("get_market_trend", market_trend)
+    measure("analyze_symbol", analyze, calls=len(sample))
+    measure("run_bot", run_cycle(False))
+    measure("run_bot_warm", run_cycle(False))
+    measure("run_bot_screener", run_cycle(True))
+    main.csv_log.close()
+    measure("update_future_prices", future_prices)
+
+    main.notifier.flush()
+    totals = stand_in.snapshot()
+    result = {
+        "symbols": size,
+        "latency": latency,
+        "import_seconds": round(import_seconds, 4),
+        "stages": stages,
+        "requests": totals["requests"],
+        "weight": totals["weight"],
+        "requests_by_path": totals["by_path"],
+        "telegram_messages": totals["telegram"],
+        "governor_throttled": main.governor.throttled,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    stand_in.stop()
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(result, f)
+
+
+def _option(name, default):
+    if name in sys.argv:
+        return sys.argv[sys.argv.index(name) + 1]
+    return default
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    sizes = [int(n) for n in _option("--symbols", ",".join(map(str, SIZES))).split(",")]
+    latency = float(_option("--latency", "0"))
+    verbose = "--verbose" in sys.argv
+    repo = os.path.dirname(os.path.abspath(__file__))
+
+    runs = []
+    for size in sizes:
+        # Eigenes Arbeitsverzeichnis: Logs, CSVs und ML-DB des Laufs landen nicht im Repo
+        with tempfile.TemporaryDirectory() as workdir:
+            out_path = os.path.join(workdir, "result.json")
+            env = dict(os.environ, PYTHONPATH=repo + os.pathsep + os.environ.get("PYTHONPATH", ""))
+            proc = subprocess.run([sys.executable, os.path.join(repo, "benchmark.py"), "--worker",
+                                   str(size), str(latency), out_path], cwd=workdir, env=env,
+                                  stdout=None if verbose else subprocess.DEVNULL, check=False)
+            if proc.returncode != 0 or not os.path.exists(out_path):
+                print(f"❌ Lauf mit {size} Symbolen fehlgeschlagen (Exit {proc.returncode})")
+                continue
+            with open(out_path, encoding="utf-8") as f:
+                run = json.load(f)
+        runs.append(run)
+        print(f"📊 {size} Symbole, Latenz {latency * 1000:.0f} ms – "
+              f"{run['requests']} Requests, Weight {run['weight']}, Peak-RSS {run['peak_rss_mb']} MB")
+        for stage in run["stages"]:
+            print(f"   {stage['stage']:<22}{stage['seconds']:>9.3f}s {stage['requests']:>6} Req "
+                  f"{stage['weight']:>6} W")
+
+    report = {"timestamp": datetime.now().isoformat(timespec="seconds"), "commit": git_commit(),
+              "python": sys.version.split()[0], "latency": latency, "runs": runs}
+    out = _option("--out", None)
+    if out is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        out = os.path.join(RESULTS_DIR, f"bench_{datetime.now():%Y%m%d_%H%M%S}.json")
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"💾 Ergebnis gespeichert: {out}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 4 and sys.argv[1] == "--worker":
+        run_worker(int(sys.argv[2]), float(sys.argv[3]), sys.argv[4])
+    else:
+        main()
@@ -0,0 +1,153 @@
+# candle_store.py
+import threading
+
+import numpy as np
+
+FIELDS = ('timestamp', 'open', 'high', 'low', 'close', 'volume')
+
+INTERVAL_MS = {
+    "1m": 60_000, "3m": 180_000, "5m": 300_000, "15m": 900_000, "30m": 1_800_000,
+    "1h": 3_600_000, "2h": 7_200_000, "4h": 14_400_000, "1d": 86_400_000,
+}
+
+
+class CandleRingBuffer:
+    """
+    Kerzen eines Symbols in einem vorab angelegten float64-Ringpuffer (6 × capacity).
+
+    Jede Kerze wird doppelt abgelegt (an pos und pos + capacity). Dadurch liegen die
+    letzten n Kerzen immer zusammenhängend im Speicher und window() ist eine reine
+    View ohne Kopie. Anhängen und Überschreiben der laufenden Kerze sind O(1).
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._data = np.zeros((len(FIELDS), 2 * capacity), dtype=np.float64)
+        self._head = 0    # nächste Schreibposition in [0, capacity)
+        self.count = 0
+
+    def _write(self, pos, row):
+        self._data[:, pos] = row
+        self._data[:, pos + self.capacity] = row
+
+    def append(self, row):
+        """
+        Neue Kerze anhängen; gleicher Timestamp wie die letzte → laufende Kerze überschreiben.
+        Ältere Kerzen werden ignoriert.
+        """
+        if self.count:
+            last = (self._head - 1) % self.capacity
+            last_ts = self._data[0, last]
+            if row[0] == last_ts:
+                self._write(last, row)
+                return
+            if row[0] < last_ts:
+                return
+        self._write(self._head, row)
+        self._head = (self._head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def window(self, n=None):
+        """
+        View (6 × n) auf die letzten n Kerzen, älteste zuerst. Gilt nur bis zum nächsten append.
+        """
+        n = self.count if n is None else min(n, self.count)
+        end = self._head + self.capacity
+        return self._data[:, end - n:end]
+
+    def last_timestamp(self):
+        if not self.count:
+            return None
+        return int(self._data[0, (self._head - 1) % self.capacity])
+
+    def replace(self, rows):
+        # Puffer komplett neu befüllen (Backfill), rows aufsteigend nach Timestamp
+        self._head = 0
+        self.count = 0
+        for row in rows[-self.capacity:]:
+            self.append(row)
+
+    @property
+    def nbytes(self):
+        return self._data.nbytes
+
+
+class CandleStore:
+    """
+    Ringpuffer pro (symbol, interval). Zeilen sind [timestamp, open, high, low, close, volume].
+    """
+
+    def __init__(self, capacity=200):
+        self.capacity = capacity
+        self._buffers = {}
+        self.lock = threading.Lock()
+
+    def _buffer(self, symbol, interval):
+        buf = self._buffers.get((symbol, interval))
+        if buf is None:
+            buf = self._buffers[(symbol, interval)] = CandleRingBuffer(self.capacity)
+        return buf
+
+    def update(self, symbol, interval, row):
+        with self.lock:
+            self._buffer(symbol, interval).append(row)
+
+    def extend(self, symbol, interval, rows):
+        """
+        Übernimmt REST-Kerzen (Backfill). Bekannte Kerzen werden durch die neuen ersetzt.
+        """
+        with self.lock:
+            buf = self._buffer(symbol, interval)
+            merged = {int(r[0]): r for r in buf.window().T.tolist()}
+            for row in rows:
+                merged[int(row[0])] = list(row)
+            buf.replace([merged[ts] for ts in sorted(merged)])
+
+    def ingest(self, symbol, interval, rows):
+        """
+        Übernimmt die neuesten REST-Kerzen (aufsteigend): die gespeicherte laufende Kerze wird
+        aktualisiert, neue werden angehängt. Liegt zwischen Puffer und rows eine Lücke, wird der
+        Puffer mit rows neu befüllt.
+        """
+        if not len(rows):
+            return
+        step = INTERVAL_MS.get(interval)
+        with self.lock:
+            buf = self._buffer(symbol, interval)
+            last_ts = buf.last_timestamp()
+            if last_ts is None or step is None or rows[0][0] > last_ts + step:
+                buf.replace(rows)
+            else:
+                for row in rows:
+                    buf.append(row)
+
+    def count(self, symbol, interval):
+        with self.lock:
+            buf = self._buffers.get((symbol, interval))
+            return buf.count if buf is not None else 0
+
+    def last_timestamp(self, symbol, interval):
+        with self.lock:
+            buf = self._buffers.get((symbol, interval))
+            return buf.last_timestamp() if buf is not None else None
+
+    def window(self, symbol, interval, limit, minimum=None):
+        """
+        Zero-Copy-View (6 × n) auf die letzten `limit` Kerzen für Indikator-Berechnungen, oder None
+        bei weniger als `minimum` (Standard: limit) Kerzen. Der Aufrufer muss `lock` halten,
+        solange er die View benutzt.
+        """
+        buf = self._buffers.get((symbol, interval))
+        if buf is None or buf.count < (limit if minimum is None else minimum):
+            return None
+        return buf.window(limit)
+
+    def memory_usage(self):
+        """
+        Belegter Speicher in Bytes pro Symbol (über alle Intervalle).
+        """
+        with self.lock:
+            usage = {}
+            for (symbol, _), buf in self._buffers.items():
+                usage[symbol] = usage.get(symbol, 0) + buf.nbytes
+            return usage
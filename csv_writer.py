@@ -0,0 +1,100 @@
+# csv_writer.py
+import csv
+import os
+import queue
+import threading
+import time
+
+_STOP = object()
+
+
+class CsvWriter:
+    """
+    Ein Hintergrund-Thread für alle CSV-Logs. write() legt die Zeile nur in eine Queue;
+    der Thread hält die Dateien offen und schreibt gesammelt, sobald `flush_rows` Zeilen
+    anstehen oder `flush_interval` Sekunden vergangen sind. close() schreibt den Rest.
+
+    Mit add_sink() lassen sich statt Dateien auch andere Ziele anhängen (z. B. der
+    FeatureStore); sie bekommen pro Durchgang alle ihre Zeilen auf einmal.
+    """
+
+    def __init__(self, flush_rows=200, flush_interval=2.0, log=print):
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.log = log
+        self.written = 0
+        self._queue = queue.Queue()
+        self._files = {}
+        self._sinks = {}
+        self._thread = threading.Thread(target=self._run, name="csv-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, path, row, header=None):
+        """
+        Reiht eine Zeile ein. Der Header wird nur geschrieben, wenn die Datei neu oder leer ist.
+        """
+        self._queue.put((path, row, header))
+
+    def add_sink(self, name, flush):
+        # Zeilen an `name` gehen gesammelt an flush(rows) statt in eine Datei
+        self._sinks[name] = flush
+
+    @property
+    def pending(self):
+        return self._queue.qsize()
+
+    def close(self, timeout=10):
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def _writer(self, path, header):
+        entry = self._files.get(path)
+        if entry is None:
+            f = open(path, "a", newline="", encoding="utf-8")
+            writer = csv.writer(f)
+            if header and os.path.getsize(path) == 0:
+                writer.writerow(header)
+            entry = self._files[path] = (f, writer)
+        return entry[1]
+
+    def _write_batch(self, batch):
+        errors = {}
+        sink_rows = {}
+        for path, row, header in batch:
+            if path in self._sinks:
+                sink_rows.setdefault(path, []).append(row)
+                continue
+            try:
+                self._writer(path, header).writerow(row)
+                self.written += 1
+            except Exception as e:
+                errors[path] = e
+        for name, rows in sink_rows.items():
+            try:
+                self._sinks[name](rows)
+                self.written += len(rows)
+            except Exception as e:
+                errors[name] = e
+        for path, e in errors.items():
+            self.log(f"[CSV] Fehler beim Schreiben in {path}: {e}")
+        for f, _ in self._files.values():
+            f.flush()
+
+    def _run(self):
+        stop = False
+        while not stop:
+            batch = []
+            deadline = time.time() + self.flush_interval
+            while len(batch) < self.flush_rows:
+                try:
+                    item = self._queue.get(timeout=max(deadline - time.time(), 0.001))
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+            if batch:
+                self._write_batch(batch)
+        for f, _ in self._files.values():
+            f.close()
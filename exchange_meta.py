@@ -0,0 +1,79 @@
+# exchange_meta.py
+import threading
+import time
+
+
+def parse_filters(symbol_info):
+    """
+    Rundungs- und Mindestwerte eines Symbols aus exchange_info.
+    tick_size/step_size bleiben Strings, damit round_to_step exakt mit Decimal rechnet.
+    """
+    filters = {f['filterType']: f for f in symbol_info['filters']}
+    price_filter = filters.get('PRICE_FILTER', {})
+    lot_size = filters.get('LOT_SIZE', {})
+    min_notional = filters.get('MIN_NOTIONAL', {})
+    return {
+        "tick_size": price_filter.get('tickSize'),
+        "step_size": lot_size.get('stepSize'),
+        "min_qty": float(lot_size.get('minQty', 0)),
+        "min_notional": float(min_notional.get('notional', min_notional.get('minNotional', 0))),
+    }
+
+
+class ExchangeInfoCache:
+    """
+    Hält exchange_info im Speicher und lädt es alle `ttl` Sekunden im Hintergrund neu.
+    Bietet einen Index symbol → Filter (tick_size, step_size, min_qty, min_notional) und
+    die Liste der handelbaren Symbole, damit run_bot und place_order ohne Netzwerkzugriff auskommen.
+    """
+
+    def __init__(self, client, universe_filter, ttl=3600, log=print):
+        self.client = client
+        self.universe_filter = universe_filter
+        self.ttl = ttl
+        self.log = log
+        self.loaded_at = 0.0
+        self._filters = {}
+        self._universe = []
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def refresh(self):
+        try:
+            info = self.client.exchange_info()
+            filters = {s['symbol']: parse_filters(s) for s in info['symbols']}
+            universe = self.universe_filter(info)
+        except Exception as e:
+            self.log(f"❌ exchange_info-Fehler: {e}")
+            return False
+        with self._lock:
+            self._filters = filters
+            self._universe = universe
+            self.loaded_at = time.time()
+        return True
+
+    def _ensure_fresh(self):
+        # Ohne Hintergrund-Thread (oder vor dem ersten Laden) synchron nachladen
+        if time.time() - self.loaded_at > self.ttl and (self._thread is None or not self.loaded_at):
+            self.refresh()
+
+    def start(self):
+        self.refresh()
+
+        def loop():
+            while True:
+                time.sleep(self.ttl)
+                self.refresh()
+
+        self._thread = threading.Thread(target=loop, name="exchange-info", daemon=True)
+        self._thread.start()
+
+    def symbols(self):
+        self._ensure_fresh()
+        with self._lock:
+            return list(self._universe)
+
+    def symbol_filters(self, symbol):
+        self._ensure_fresh()
+        with self._lock:
+            return self._filters.get(symbol)
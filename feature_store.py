@@ -0,0 +1,168 @@
+# feature_store.py
+import os
+import sqlite3
+import sys
+import threading
+
+import numpy as np
+import pandas as pd
+
+# Ein Pfad für alle Schreiber und Leser; /mydata ist das persistente Volume im Deployment
+ML_DB_PATH = os.getenv("ML_DB_PATH", "/mydata/ml_log.db" if os.path.isdir("/mydata") else "ml_log.db")
+
+COLUMNS = [
+    "timestamp", "symbol", "direction", "rsi", "ema20", "ema50", "macd", "volume_ratio",
+    "atr", "market_trend", "btc_strength", "weekday", "hour", "price_now", "future_price", "label"
+]
+
+LABEL_MOVE = 0.002  # Mindestbewegung in Signalrichtung für label = 1
+EXPIRED_LABEL = -1  # Zeile ohne future_price, die nicht mehr aufgelöst wird (z. B. delistetes Symbol)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS ml_log (
+    id INTEGER PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    direction TEXT,
+    rsi REAL,
+    ema20 REAL,
+    ema50 REAL,
+    macd REAL,
+    volume_ratio REAL,
+    atr REAL,
+    market_trend TEXT,
+    btc_strength REAL,
+    weekday INTEGER,
+    hour INTEGER,
+    price_now REAL,
+    future_price REAL,
+    label INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_ml_log_ts_symbol ON ml_log (timestamp, symbol);
+DROP INDEX IF EXISTS idx_ml_log_pending;
+CREATE INDEX IF NOT EXISTS idx_ml_log_open ON ml_log (timestamp) WHERE future_price IS NULL AND label IS NULL;
+"""
+
+
+def label_rows(direction, price_now, future_price, move=LABEL_MOVE):
+    """
+    Vektorisiertes Label: 1, wenn der Preis nach 5 Minuten mindestens `move` in
+    Signalrichtung gelaufen ist (LONG: +0.2 %, SHORT: -0.2 %), sonst 0.
+    """
+    direction = pd.Series(direction).astype(str).str.upper().to_numpy()
+    price_now = np.asarray(price_now, dtype=np.float64)
+    future_price = np.asarray(future_price, dtype=np.float64)
+    good = np.where(direction == "LONG", future_price >= price_now * (1 + move),
+                    (direction == "SHORT") & (future_price <= price_now * (1 - move)))
+    return good.astype(np.int64)
+
+
+class FeatureStore:
+    """
+    ML-Feature-Log in SQLite mit typisierten Spalten. Index auf (timestamp, symbol) für
+    Zeitbereiche und ein Teil-Index auf Zeilen ohne future_price, damit offene Zeilen
+    in O(offen) statt O(Dateigrösse) gelesen werden.
+    """
+
+    def __init__(self, path=ML_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+
+    def append(self, rows):
+        """
+        rows: Listen in der Reihenfolge von COLUMNS (leere Strings werden zu NULL).
+        """
+        rows = [[None if value == "" else value for value in row] for row in rows]
+        placeholders = ", ".join("?" * len(COLUMNS))
+        with self._lock, self._conn:
+            self._conn.executemany(
+                f"INSERT INTO ml_log ({', '.join(COLUMNS)}) VALUES ({placeholders})", rows)
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return pd.read_sql_query(sql, self._conn, params=params)
+
+    def pending(self, before=None):
+        """
+        Offene Zeilen ohne future_price (optional nur mit timestamp < before), älteste zuerst;
+        abgelaufene Zeilen (siehe expire) zählen nicht mehr dazu.
+        """
+        sql = ("SELECT id, timestamp, symbol, direction, price_now FROM ml_log "
+               "WHERE future_price IS NULL AND label IS NULL")
+        params = ()
+        if before is not None:
+            sql += " AND timestamp < ?"
+            params = (before,)
+        return self._query(sql + " ORDER BY timestamp", params)
+
+    def set_future_prices(self, updates):
+        """
+        updates: (id, future_price, label) – label darf None sein.
+        """
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE ml_log SET future_price = ?, label = ? WHERE id = ?",
+                [(price, None if label is None else int(label), row_id)
+                 for row_id, price, label in updates])
+
+    def expire(self, before):
+        """
+        Markiert offene Zeilen mit timestamp < before als abgelaufen (label = EXPIRED_LABEL,
+        future_price bleibt NULL), damit sie nicht in jedem Labeling-Lauf erneut angefragt werden.
+        Rückgabe: Anzahl markierter Zeilen.
+        """
+        with self._lock, self._conn:
+            return self._conn.execute(
+                "UPDATE ml_log SET label = ? WHERE future_price IS NULL AND label IS NULL AND timestamp < ?",
+                (EXPIRED_LABEL, before)).rowcount
+
+    def range(self, start=None, end=None, symbol=None, labeled_only=False, columns=None):
+        """
+        Zeilen mit start <= timestamp < end (Strings 'YYYY-MM-DD HH:MM:SS'), optional pro Symbol
+        und nur mit den angegebenen Spalten.
+        """
+        columns = [c for c in (columns or COLUMNS) if c in COLUMNS]
+        clauses, params = [], []
+        if start is not None:
+            clauses.append("timestamp >= ?")
+            params.append(start)
+        if end is not None:
+            clauses.append("timestamp < ?")
+            params.append(end)
+        if symbol is not None:
+            clauses.append("symbol = ?")
+            params.append(symbol)
+        if labeled_only:
+            clauses.append("future_price IS NOT NULL")
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        return self._query(f"SELECT {', '.join(columns)} FROM ml_log{where} ORDER BY timestamp", params)
+
+    def recent(self, n=1):
+        df = self._query(f"SELECT {', '.join(COLUMNS)} FROM ml_log ORDER BY id DESC LIMIT ?", (n,))
+        return df.iloc[::-1].reset_index(drop=True)
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM ml_log").fetchone()[0]
+
+    def import_csv(self, path):
+        """
+        Übernimmt eine alte ml_log.csv (ohne Header; eine Kopfzeile wird übersprungen).
+        """
+        df = pd.read_csv(path, header=None, names=COLUMNS, dtype=str, keep_default_na=False)
+        df = df[df["timestamp"] != "timestamp"]
+        self.append(df.values.tolist())
+        return len(df)
+
+
+if __name__ == "__main__":
+    # Migration: python feature_store.py import ml_log.csv [/pfad/zu/ml_log.db]
+    if len(sys.argv) >= 3 and sys.argv[1] == "import":
+        store = FeatureStore(sys.argv[3] if len(sys.argv) > 3 else ML_DB_PATH)
+        print(f"✅ {store.import_csv(sys.argv[2])} Zeilen nach {store.path} übernommen")
+    else:
+        store = FeatureStore()
+        print(f"📂 {store.path}: {store.count()} Zeilen, {len(store.pending())} ohne future_price")
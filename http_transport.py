@@ -0,0 +1,57 @@
+# http_transport.py
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+RETRY_STATUS = (500, 502, 503, 504)
+
+
+class HttpTransport:
+    """
+    Gemeinsame HTTP-Schicht: eine requests-Session pro Host mit Keep-Alive-Verbindungspool,
+    damit nicht jeder Request eine neue TCP+TLS-Verbindung aufbaut.
+    GET-Requests werden bei Verbindungsfehlern und 5xx mit Jitter wiederholt;
+    POST nie (nicht idempotent). 429/418 gehen unverändert an den Aufrufer (→ WeightGovernor).
+    """
+
+    def __init__(self, pool_size=32, timeout=5, retries=2, backoff=0.2):
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def mount(self, session):
+        # Pool-Adapter auf eine bestehende Session setzen (z. B. die des Binance-Clients)
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.pool_size, max_retries=0)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def session(self, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = self._sessions[host] = self.mount(requests.Session())
+            return session
+
+    def get(self, url, params=None, timeout=None):
+        session = self.session(url)
+        for attempt in range(self.retries + 1):
+            try:
+                res = session.get(url, params=params, timeout=timeout or self.timeout)
+                if res.status_code not in RETRY_STATUS or attempt == self.retries:
+                    return res
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.retries:
+                    raise
+            time.sleep(self.backoff * (2 ** attempt) * random.uniform(0.5, 1.5))
+
+    def post(self, url, timeout=None, **kwargs):
+        return self.session(url).post(url, timeout=timeout or self.timeout, **kwargs)
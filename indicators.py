@@ -0,0 +1,195 @@
+# indicators.py
+import math
+from collections import deque
+
+NAN = float("nan")
+
+
+class EMA:
+    """
+    Exponentieller Durchschnitt mit exakt derselben Rechnung wie pandas
+    `ewm(adjust=False).mean()` (darauf bauen EMAIndicator, MACD und RSI in `ta` auf).
+    """
+
+    def __init__(self, span=None, alpha=None, min_periods=None):
+        com = (span - 1) / 2 if span is not None else (1 - alpha) / alpha
+        self.alpha = 1. / (1. + float(com))
+        self.min_periods = min_periods if min_periods is not None else span
+        self.value = None
+        self.count = 0
+
+    def _next(self, x):
+        w = self.value
+        if w is None:
+            return x
+        if w != x:
+            old_wt = 1. - self.alpha
+            w = (old_wt * w + self.alpha * x) / (old_wt + self.alpha)
+        return w
+
+    def update(self, x):
+        self.value = self._next(x)
+        self.count += 1
+
+    def peek(self, x):
+        # Wert inklusive x, ohne den Zustand zu verändern
+        return self._next(x) if self.count + 1 >= self.min_periods else NAN
+
+    @property
+    def ready(self):
+        return self.count >= self.min_periods
+
+
+class RollingMean:
+    """
+    Gleitender Mittelwert über `window` Werte; Summe mit Kahan-Korrektur laufend fortgeschrieben.
+    Gespeichert werden nur die letzten window - 1 abgeschlossenen Werte, peek() ergänzt den aktuellen.
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self._values = deque()
+        self._sum = 0.0
+        self._comp = 0.0
+
+    def _add(self, x):
+        y = x - self._comp
+        t = self._sum + y
+        self._comp = (t - self._sum) - y
+        self._sum = t
+
+    def update(self, x):
+        self._values.append(x)
+        self._add(x)
+        if len(self._values) > self.window - 1:
+            self._add(-self._values.popleft())
+
+    def peek(self, x):
+        if len(self._values) < self.window - 1:
+            return NAN
+        return (self._sum + x) / self.window
+
+
+class RSI:
+    """
+    Wilder-RSI wie `ta.momentum.RSIIndicator`: Auf- und Abwärtsbewegungen als EMA mit alpha = 1/window.
+    """
+
+    def __init__(self, window=14):
+        self.up = EMA(alpha=1 / window, min_periods=window)
+        self.down = EMA(alpha=1 / window, min_periods=window)
+        self.prev_close = None
+
+    def _moves(self, close):
+        # Erste Kerze: Differenz NaN → in ta als 0.0 gezählt
+        diff = close - self.prev_close if self.prev_close is not None else NAN
+        return (diff if diff > 0 else 0.0), (-diff if diff < 0 else 0.0)
+
+    def update(self, close):
+        up, down = self._moves(close)
+        self.up.update(up)
+        self.down.update(down)
+        self.prev_close = close
+
+    def peek(self, close):
+        up, down = self._moves(close)
+        emaup = self.up.peek(up)
+        emadn = self.down.peek(down)
+        if math.isnan(emadn):
+            return NAN
+        if emadn == 0:
+            return 100.0
+        return 100 - (100 / (1 + emaup / emadn))
+
+
+class MACDState:
+    """
+    MACD wie `ta.trend.MACD`: Signal-Linie startet erst, wenn die langsame EMA gültig ist.
+    """
+
+    def __init__(self, window_fast=12, window_slow=26, window_sign=9):
+        self.fast = EMA(span=window_fast)
+        self.slow = EMA(span=window_slow)
+        self.signal = EMA(span=window_sign)
+
+    def _line(self, close):
+        fast = self.fast.peek(close)
+        slow = self.slow.peek(close)
+        return fast - slow
+
+    def update(self, close):
+        line = self._line(close)
+        self.fast.update(close)
+        self.slow.update(close)
+        if not math.isnan(line):
+            self.signal.update(line)
+
+    def peek(self, close):
+        line = self._line(close)
+        if math.isnan(line):
+            return NAN, NAN
+        return line, self.signal.peek(line)
+
+
+class IndicatorEngine:
+    """
+    Indikator-Zustand eines Symbols. Jede abgeschlossene Kerze wird genau einmal mit update()
+    eingerechnet (O(1)); die laufende Kerze fliesst nur über snapshot() ein, ohne den Zustand
+    zu verändern. Die Werte entsprechen denen von analyze_symbol über dieselbe Kerzenhistorie.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.rsi = RSI(14)
+        self.ema20 = EMA(span=20)
+        self.ema50 = EMA(span=50)
+        self.macd = MACDState()
+        self.atr = RollingMean(14)
+        self.volume = RollingMean(20)
+        self.last_ts = None
+        self.count = 0
+
+    def update(self, ts, high, low, close, volume):
+        self.rsi.update(close)
+        self.ema20.update(close)
+        self.ema50.update(close)
+        self.macd.update(close)
+        self.atr.update(high - low)
+        self.volume.update(volume)
+        self.last_ts = ts
+        self.count += 1
+
+    def snapshot(self, high, low, close, volume):
+        macd_line, macd_signal = self.macd.peek(close)
+        return {
+            "rsi": self.rsi.peek(close),
+            "ema20": self.ema20.peek(close),
+            "ema50": self.ema50.peek(close),
+            "macd_line": macd_line,
+            "macd_signal": macd_signal,
+            "atr": self.atr.peek(high - low),
+            "avg_volume": self.volume.peek(volume),
+        }
+
+    def sync(self, candles):
+        """
+        candles: 6 × n (timestamp, open, high, low, close, volume), letzte Spalte = laufende Kerze.
+        Rechnet alle noch nicht gesehenen abgeschlossenen Kerzen ein – bei einer Lücke wird der
+        Zustand aus dem Fenster neu aufgebaut – und liefert die Werte inkl. laufender Kerze.
+        """
+        ts, _, high, low, close, volume = candles
+        n = len(ts)
+        start = 0
+        if self.last_ts is not None:
+            known = [i for i in range(n - 1) if ts[i] == self.last_ts]
+            if known:
+                start = known[0] + 1
+            elif ts[n - 1] <= self.last_ts:
+                start = n - 1   # nichts Neues
+            else:
+                self.reset()
+        for i in range(start, n - 1):
+            self.update(ts[i], high[i], low[i], close[i], volume[i])
+        return self.snapshot(high[n - 1], low[n - 1], close[n - 1], volume[n - 1])
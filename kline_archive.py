@@ -0,0 +1,174 @@
+# kline_archive.py
+import os
+import sys
+import threading
+
+import numpy as np
+
+from candle_store import FIELDS, INTERVAL_MS
+
+# Eine Datei pro Symbol und Intervall: <root>/<interval>/<SYMBOL>.bin
+KLINE_ARCHIVE_DIR = os.getenv("KLINE_ARCHIVE_DIR",
+                              "/mydata/klines" if os.path.isdir("/mydata") else "klines")
+
+ROW_BYTES = len(FIELDS) * 8         # eine Kerze = 6 × float64, feste Breite
+MAX_REST_CANDLES = 1500             # Binance-Maximum pro klines-Request
+
+
+class KlineArchive:
+    """
+    Historische (abgeschlossene) Kerzen als Binärdateien mit fester Zeilenbreite:
+    pro Kerze timestamp, open, high, low, close, volume als float64, aufsteigend nach Zeit.
+
+    append() hängt nur Kerzen an, die neuer als die letzte gespeicherte sind. read() liefert
+    eine memory-gemappte View (6 × n) – Jahre an 5m-Kerzen ohne sie in den Speicher zu laden.
+    check() findet Lücken, Duplikate und abgeschnittene Zeilen; repair() schreibt die Datei
+    sortiert und bereinigt neu.
+    """
+
+    def __init__(self, root=KLINE_ARCHIVE_DIR):
+        self.root = root
+        self._locks = {}
+        self._locks_lock = threading.Lock()
+
+    def path(self, symbol, interval):
+        return os.path.join(self.root, interval, f"{symbol}.bin")
+
+    def _lock(self, symbol, interval):
+        with self._locks_lock:
+            return self._locks.setdefault((symbol, interval), threading.Lock())
+
+    def symbols(self, interval):
+        folder = os.path.join(self.root, interval)
+        if not os.path.isdir(folder):
+            return []
+        return sorted(name[:-4] for name in os.listdir(folder) if name.endswith(".bin"))
+
+    def count(self, symbol, interval):
+        path = self.path(symbol, interval)
+        return os.path.getsize(path) // ROW_BYTES if os.path.exists(path) else 0
+
+    def last_timestamp(self, symbol, interval):
+        n = self.count(symbol, interval)
+        if not n:
+            return None
+        with open(self.path(symbol, interval), "rb") as f:
+            f.seek((n - 1) * ROW_BYTES)
+            return int(np.frombuffer(f.read(8), dtype=np.float64)[0])
+
+    def append(self, symbol, interval, rows):
+        """
+        rows: abgeschlossene Kerzen (n × 6). Ältere oder bereits gespeicherte werden übersprungen.
+        Rückgabe: Anzahl angehängter Kerzen.
+        """
+        rows = np.asarray(rows, dtype=np.float64).reshape(-1, len(FIELDS))
+        with self._lock(symbol, interval):
+            last = self.last_timestamp(symbol, interval)
+            if last is not None:
+                rows = rows[rows[:, 0] > last]
+            if not len(rows):
+                return 0
+            rows = rows[np.argsort(rows[:, 0], kind="stable")]
+            rows = rows[np.concatenate(([True], np.diff(rows[:, 0]) > 0))]
+            path = self.path(symbol, interval)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "ab") as f:
+                # Abgeschnittene letzte Zeile (Absturz beim Schreiben) nicht fortsetzen
+                f.truncate(self.count(symbol, interval) * ROW_BYTES)
+                f.seek(0, os.SEEK_END)
+                f.write(np.ascontiguousarray(rows).tobytes())
+            return len(rows)
+
+    def read(self, symbol, interval, start=None, end=None):
+        """
+        Memory-gemappte View 6 × n (nur lesend) auf die Kerzen mit start <= timestamp < end (ms).
+        """
+        n = self.count(symbol, interval)
+        if not n:
+            return np.empty((len(FIELDS), 0))
+        data = np.memmap(self.path(symbol, interval), dtype=np.float64, mode="r",
+                         shape=(n, len(FIELDS)))
+        timestamps = data[:, 0]
+        lo = 0 if start is None else int(np.searchsorted(timestamps, start, side="left"))
+        hi = n if end is None else int(np.searchsorted(timestamps, end, side="left"))
+        return data[lo:hi].T
+
+    def fill(self, symbol, interval, fetch, until, since=None):
+        """
+        Lädt fehlende Kerzen nach der letzten gespeicherten (bzw. ab `since`, wenn die Datei leer
+        ist) bis einschliesslich der Kerze mit Eröffnungszeit `until` über REST nach.
+        fetch(symbol, interval, limit, start_time, end_time) liefert Zeilen (n × 6) oder None.
+        """
+        step = INTERVAL_MS[interval]
+        last = self.last_timestamp(symbol, interval)
+        start = last + step if last is not None else since
+        if start is None:
+            return 0
+        added = 0
+        while start <= until:
+            end = min(until, start + (MAX_REST_CANDLES - 1) * step)
+            rows = fetch(symbol, interval, (end - start) // step + 1, start, end)
+            if rows is None:
+                break
+            rows = np.asarray(rows, dtype=np.float64).reshape(-1, len(FIELDS))
+            added += self.append(symbol, interval, rows[rows[:, 0] <= until])
+            start = end + step
+        return added
+
+    def check(self, symbol, interval):
+        """
+        Integritätsprüfung: Lücken (fehlende Kerzen), Duplikate, falsche Reihenfolge und
+        angefangene Zeilen am Dateiende.
+        """
+        step = INTERVAL_MS[interval]
+        path = self.path(symbol, interval)
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        timestamps = np.asarray(self.read(symbol, interval)[0])
+        diff = np.diff(timestamps)
+        gap_at = np.flatnonzero(diff > step)
+        return {
+            "rows": int(len(timestamps)),
+            "first": int(timestamps[0]) if len(timestamps) else None,
+            "last": int(timestamps[-1]) if len(timestamps) else None,
+            "gaps": [(int(timestamps[i] + step), int(timestamps[i + 1] - step)) for i in gap_at],
+            "missing": int(((diff[gap_at] // step) - 1).sum()),
+            "duplicates": int((diff == 0).sum()),
+            "unordered": int((diff < 0).sum()),
+            "partial_bytes": int(size % ROW_BYTES),
+        }
+
+    def repair(self, symbol, interval, rows=None):
+        """
+        Schreibt die Datei sortiert, ohne Duplikate (neueste Zeile gewinnt) und ohne angefangene
+        Zeile neu; optional mit zusätzlichen Kerzen (z. B. per REST nachgeladene Lücken).
+        """
+        with self._lock(symbol, interval):
+            data = np.array(self.read(symbol, interval).T)
+            if rows is not None:
+                data = np.concatenate([data, np.asarray(rows, dtype=np.float64).reshape(-1, len(FIELDS))])
+            order = np.argsort(data[:, 0], kind="stable")
+            data = data[order]
+            keep = np.concatenate((data[1:, 0] != data[:-1, 0], [True])) if len(data) else []
+            data = data[keep]
+            path = self.path(symbol, interval)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path + ".tmp", "wb") as f:
+                f.write(np.ascontiguousarray(data).tobytes())
+            os.replace(path + ".tmp", path)
+            return len(data)
+
+
+if __name__ == "__main__":
+    # python kline_archive.py check|repair [interval] [Verzeichnis]
+    command = sys.argv[1] if len(sys.argv) > 1 else "check"
+    interval = sys.argv[2] if len(sys.argv) > 2 else "5m"
+    archive = KlineArchive(sys.argv[3] if len(sys.argv) > 3 else KLINE_ARCHIVE_DIR)
+    for symbol in archive.symbols(interval):
+        if command == "repair":
+            print(f"🔧 {symbol}: {archive.repair(symbol, interval)} Kerzen")
+            continue
+        report = archive.check(symbol, interval)
+        ok = not (report["gaps"] or report["duplicates"] or report["unordered"] or report["partial_bytes"])
+        print(f"{'✅' if ok else '⚠️'} {symbol}: {report['rows']} Kerzen, {len(report['gaps'])} Lücken "
+              f"({report['missing']} fehlend), {report['duplicates']} Duplikate, "
+              f"{report['unordered']} unsortiert, {report['partial_bytes']} Rest-Bytes")
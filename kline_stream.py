@@ -0,0 +1,128 @@
+# kline_stream.py
+import json
+import threading
+import time
+
+import websocket
+
+STREAM_URL = "wss://fstream.binance.com"
+MAX_STREAMS_PER_CONNECTION = 200  # Binance-Limit pro Verbindung
+
+
+def parse_kline_message(message):
+    """
+    Wandelt eine (Combined-)Stream-Nachricht in (symbol, interval, zeile, geschlossen) um.
+    """
+    payload = json.loads(message)
+    data = payload.get("data", payload)
+    if data.get("e") != "kline":
+        return None
+    k = data["k"]
+    row = [int(k["t"]), float(k["o"]), float(k["h"]), float(k["l"]), float(k["c"]), float(k["v"])]
+    return k["s"], k["i"], row, bool(k.get("x"))
+
+
+class KlineStream:
+    """
+    Abonniert die Kline-Streams aller Symbole über Combined Streams (max. 200 pro Verbindung)
+    und schreibt jede Aktualisierung in den CandleStore.
+
+    REST wird nur noch über `backfill(symbol, interval, limit)` benutzt: beim Start und nach
+    jedem Reconnect für die Symbole der betroffenen Verbindung, um die Lücke zu schliessen.
+    `base_url` lässt sich auf einen lokalen WebSocket-Server umstellen.
+    `on_close(symbol, interval, row)` wird für jede abgeschlossene Kerze aufgerufen.
+    """
+
+    def __init__(self, symbols, interval, store, backfill, base_url=STREAM_URL, log=print,
+                 on_close=None):
+        self.symbols = list(symbols)
+        self.interval = interval
+        self.store = store
+        self.backfill = backfill
+        self.base_url = base_url.rstrip("/")
+        self.log = log
+        self.on_close = on_close
+        self.messages = 0
+        self.reconnects = 0
+        self._running = False
+        self._connected = {}
+        self._threads = []
+
+    def chunks(self):
+        return [self.symbols[i:i + MAX_STREAMS_PER_CONNECTION]
+                for i in range(0, len(self.symbols), MAX_STREAMS_PER_CONNECTION)]
+
+    def url_for(self, symbols):
+        streams = "/".join(f"{s.lower()}@kline_{self.interval}" for s in symbols)
+        return f"{self.base_url}/stream?streams={streams}"
+
+    def fill_gaps(self, symbols):
+        for symbol in symbols:
+            try:
+                rows = self.backfill(symbol, self.interval, self.store.capacity)
+                if rows is not None and len(rows):
+                    self.store.extend(symbol, self.interval, rows)
+            except Exception as e:
+                self.log(f"{symbol}: ❌ Backfill-Fehler: {e}")
+
+    def start(self):
+        self._running = True
+        self.fill_gaps(self.symbols)
+        for index, symbols in enumerate(self.chunks()):
+            thread = threading.Thread(target=self._run_connection, args=(index, symbols),
+                                      name=f"kline-stream-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        self.log(f"📡 Kline-Stream gestartet: {len(self.symbols)} Symbole, {len(self._threads)} Verbindungen")
+
+    def stop(self):
+        self._running = False
+        for ws in list(self._connected.values()):
+            if ws is not None:
+                ws.close()
+
+    def is_live(self):
+        return self._running and bool(self._connected) and all(
+            ws is not None for ws in self._connected.values())
+
+    def _run_connection(self, index, symbols):
+        first = True
+        delay = 1
+        self._connected[index] = None
+        while self._running:
+            def on_open(ws):
+                nonlocal first, delay
+                if not first:
+                    # Während der Trennung verpasste Kerzen über REST nachladen
+                    self.reconnects += 1
+                    self.fill_gaps(symbols)
+                first = False
+                delay = 1
+                self._connected[index] = ws
+
+            def on_message(ws, message):
+                try:
+                    parsed = parse_kline_message(message)
+                except (ValueError, KeyError) as e:
+                    self.log(f"⚠️ Ungültige Stream-Nachricht: {e}")
+                    return
+                if parsed is not None:
+                    symbol, interval, row, closed = parsed
+                    self.messages += 1
+                    self.store.update(symbol, interval, row)
+                    if closed and self.on_close is not None:
+                        try:
+                            self.on_close(symbol, interval, row)
+                        except Exception as e:
+                            self.log(f"{symbol}: ❌ Fehler bei abgeschlossener Kerze: {e}")
+
+            def on_error(ws, error):
+                self.log(f"⚠️ Stream-Fehler (Verbindung {index}): {error}")
+
+            ws = websocket.WebSocketApp(self.url_for(symbols), on_open=on_open,
+                                        on_message=on_message, on_error=on_error)
+            ws.run_forever(ping_interval=60, ping_timeout=10)
+            self._connected[index] = None
+            if self._running:
+                time.sleep(delay)
+                delay = min(delay * 2, 30)
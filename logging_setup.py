@@ -0,0 +1,52 @@
+# logging_setup.py
+import atexit
+import gzip
+import logging
+import os
+import queue
+import shutil
+import sys
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler, TimedRotatingFileHandler
+
+
+def _gzip_namer(name):
+    return name + ".gz"
+
+
+def _gzip_rotator(source, dest):
+    # Rotierte Datei komprimieren und das Original entfernen
+    with open(source, "rb") as f_in, gzip.open(dest, "wb") as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    os.remove(source)
+
+
+def setup_logging(name="bot", path="log.txt", level="INFO", max_bytes=10 * 1024 * 1024,
+                  backup_count=5, when=None):
+    """
+    Logger, dessen Ausgaben nur in eine Queue gelegt werden; ein QueueListener-Thread schreibt
+    sie auf die Konsole und in die Logdatei. Die Datei rotiert nach Grösse (max_bytes) oder,
+    wenn `when` gesetzt ist (z. B. "midnight"), nach Zeit; alte Dateien werden mit gzip komprimiert.
+    """
+    if when:
+        file_handler = TimedRotatingFileHandler(path, when=when, backupCount=backup_count,
+                                                encoding="utf-8")
+    else:
+        file_handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count,
+                                           encoding="utf-8")
+    file_handler.namer = _gzip_namer
+    file_handler.rotator = _gzip_rotator
+    file_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setFormatter(logging.Formatter("%(message)s"))
+
+    log_queue = queue.Queue(-1)
+    listener = QueueListener(log_queue, console_handler, file_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+
+    logger = logging.getLogger(name)
+    logger.handlers = [QueueHandler(log_queue)]
+    logger.setLevel(level)
+    logger.propagate = False
+    return logger
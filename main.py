@@ -1,5 +1,8 @@
-from ml_predict import predict_signal
+from ml_predict import ModelServer
 from dotenv import load_dotenv
+import atexit
+import signal
+import logging
 import os
 
 # Direkt nach dem Import:
@@ -8,77 +11,147 @@ load_dotenv()
 # Schalter: Machine Learning aktivieren/deaktivieren
 USE_ML = False
 
+# Orders nur, wenn das ML-Modell mindestens diese Erfolgswahrscheinlichkeit liefert (0 = aus)
+ML_THRESHOLD = float(os.getenv("ML_THRESHOLD", "0"))
+
+# Schalter: alle Symbole gemeinsam vektorisiert auswerten statt einzeln
+USE_SCREENER = os.getenv("USE_SCREENER", "0") == "1"
+
+# Basis-URLs (lassen sich für Tests/Benchmarks auf einen lokalen Server umstellen)
+BINANCE_REST_URL = os.getenv("BINANCE_REST_URL", "https://fapi.binance.com").rstrip("/")
+TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL", "https://api.telegram.org").rstrip("/")
+
+# Schalter: Kerzen per WebSocket-Stream statt REST-Polling
+USE_STREAM = os.getenv("USE_STREAM", "0") == "1"
+STREAM_URL = os.getenv("BINANCE_STREAM_URL", "wss://fstream.binance.com")
+
+# Schalter: abgeschlossene Kerzen im lokalen Kline-Archiv speichern (Backtests, Warmstart)
+USE_ARCHIVE = os.getenv("USE_KLINE_ARCHIVE", "0") == "1"
+KLINE_ARCHIVE_DAYS = int(os.getenv("KLINE_ARCHIVE_DAYS", "30"))  # Historie für neue Symbole
+
+# Schalter: Symbole nur bei Kerzenschluss auswerten (nur abgeschlossene Kerzen) statt jede Minute
+EVAL_ON_CLOSE = os.getenv("EVAL_ON_CLOSE", "0") == "1"
+EVAL_INTERVAL = "5m"
+# Fast-Path zwischen zwei Schlüssen (nur mit EVAL_ON_CLOSE, standardmässig aus): Symbole, die in
+# einer Richtung genau ein Kriterium knapp verfehlen (Abstände siehe signal_rules.near_masks,
+# Volumen-Filter bestanden), werden jede Minute auf der laufenden Kerze geprüft
+FAST_PATH = os.getenv("FAST_PATH", "0") == "1"
+
 # Dann kommen alle anderen Importe:
-import requests
 import time
+import queue
 import threading
-import schedule
-from flask import Flask
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from flask import Flask, Response, jsonify
+import numpy as np
 import pandas as pd
-from ta.momentum import RSIIndicator
-from ta.trend import EMAIndicator, MACD
 from ta.trend import ADXIndicator
 from binance.um_futures import UMFutures
 from decimal import Decimal, ROUND_DOWN
 from ta.volatility import AverageTrueRange
-
-import csv
-from datetime import datetime
+from rate_limiter import WeightGovernor, GovernedClient, kline_weight, SCAN, BACKFILL
+from candle_store import CandleStore, FIELDS, INTERVAL_MS
+from kline_archive import KlineArchive
+from kline_stream import KlineStream
+from exchange_meta import ExchangeInfoCache
+from http_transport import HttpTransport
+from notifier import TelegramNotifier
+from csv_writer import CsvWriter
+from logging_setup import setup_logging
+from metrics import MetricsRegistry
+from scheduler import CycleScheduler
+from feature_store import FeatureStore, label_rows
+from indicators import IndicatorEngine
+import screener
+from signal_rules import (criteria_masks, near_masks, is_near_trigger, describe_criteria,
+                          volume_too_low, volume_reason,
+                          take_profit_stop_loss, position_size, potential_loss, MAX_LOSS)
+
+from datetime import datetime, timedelta
+
+# 📝 Alle CSV-Logs laufen über einen Hintergrund-Writer (Zeilen werden gesammelt geschrieben)
+csv_log = CsvWriter(
+    flush_rows=int(os.getenv("CSV_FLUSH_ROWS", "200")),
+    flush_interval=float(os.getenv("CSV_FLUSH_INTERVAL", "2"))
+)
+atexit.register(csv_log.close)
+
+# 🗄️ ML-Feature-Log in SQLite (Pfad: ML_DB_PATH), geschrieben über denselben Writer
+ML_LOG = "ml_log"
+feature_store = FeatureStore()
+csv_log.add_sink(ML_LOG, feature_store.append)
 
 def log_ml_data(symbol, direction, rsi, ema20, ema50, macd, volume_ratio, atr, market_trend, btc_strength, price_now):
-    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    weekday = datetime.now().weekday()
-    hour = datetime.now().hour
+    now = datetime.now()
+    csv_log.write(ML_LOG, [
+        now.strftime("%Y-%m-%d %H:%M:%S"),
+        symbol,
+        direction,
+        round(rsi, 2),
+        round(ema20, 5),
+        round(ema50, 5),
+        round(macd, 5),
+        round(volume_ratio, 3),
+        round(atr, 5),
+        market_trend,
+        btc_strength,
+        now.weekday(),
+        now.hour,
+        price_now,
+        "",  # Platzhalter für Preis in 5 Minuten
+        "",  # Label (1/0) später berechnet
+    ])
+
+
+
+def change_since(df, interval):
+    """
+    Prozentuale Veränderung seit Beginn der vorherigen `interval`-Kerze, aus 5m-Kerzen abgeleitet –
+    entspricht open der vorletzten bis close der laufenden Kerze in `interval`.
+    """
+    step = INTERVAL_MS[interval]
+    ts = df['timestamp'].to_numpy()
+    start = (ts[-1] // step) * step - step
+    i = np.searchsorted(ts, start)
+    if i >= len(ts) or ts[i] != start:
+        return 0
+    open_price = df['open'].iloc[i]
+    return ((df['close'].iloc[-1] - open_price) / open_price) * 100
 
+
+def get_market_trend(client, symbols, closed_only=False):
+    """
+    Marktphase aus den 30 umsatzstärksten Symbolen: 24h-Veränderung und Quote-Volumen aus einem
+    einzigen /ticker/24hr-Aufruf, 5m/15m/1h-Veränderung aus den (gecachten) 5m-Kerzen.
+    closed_only wie im Scan, damit beide dieselben Kerzen laden (ein Abruf pro Symbol und Zyklus).
+    """
     try:
-        with open("/mydata/ml_log.csv", "a", newline="") as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                now,
-                symbol,
-                direction,
-                round(rsi, 2),
-                round(ema20, 5),
-                round(ema50, 5),
-                round(macd, 5),
-                round(volume_ratio, 3),
-                round(atr, 5),
-                market_trend,
-                btc_strength,
-                weekday,
-                hour,
-                price_now,
-                "",  # Platzhalter für Preis in 5 Minuten
-                "",  # Label (1/0) später berechnet
-            ])
+        tickers = client.ticker_24hr_price_change()
     except Exception as e:
-        print(f"[ML_LOG] Fehler beim Schreiben in ml_log.csv: {e}", flush=True)
-
-
-
-def get_market_trend(client, symbols):
-    import time
+        api_errors_total.inc(source="ticker")
+        log_print(f"❌ Ticker-Fehler: {e}")
+        return "neutral"
 
-    def get_change(symbol, interval):
-        try:
-            klines = client.klines(symbol=symbol, interval=interval, limit=2)
-            open_price = float(klines[0][1])
-            close_price = float(klines[1][4])
-            return ((close_price - open_price) / open_price) * 100
-        except Exception as e:
-            print(f"Fehler bei {symbol} ({interval}): {e}")
-            return 0
+    universe = set(symbols)
+    tickers = {t['symbol']: t for t in tickers if t['symbol'] in universe}
+    top_symbols = sorted(tickers, key=lambda sym: float(tickers[sym]['quoteVolume']), reverse=True)[:30]
 
     bullish = 0
     bearish = 0
 
-    top_symbols = symbols[:30]  # nur die ersten 30 (sortiert nach Volumen vorher)
+    # Kerzen parallel laden; dieselben Einträge nutzt danach der Scan aus dem Cache
+    with ThreadPoolExecutor(max_workers=SCAN_WORKERS, thread_name_prefix="trend") as pool:
+        frames = dict(zip(top_symbols, pool.map(lambda sym: get_candles(sym, limit=50, closed_only=closed_only), top_symbols)))
 
     for symbol in top_symbols:
-        c5 = get_change(symbol, "5m")
-        c15 = get_change(symbol, "15m")
-        c1h = get_change(symbol, "1h")
-        c24h = get_change(symbol, "1d")  # daily
+        c24h = float(tickers[symbol]['priceChangePercent'])
+        df = frames[symbol]
+        if df is None or len(df) < 2:
+            c5 = c15 = c1h = 0
+        else:
+            c5 = change_since(df, "5m")
+            c15 = change_since(df, "15m")
+            c1h = change_since(df, "1h")
 
         bullish_criteria = sum([
             c5 > 0.3,
@@ -98,8 +171,6 @@ def get_market_trend(client, symbols):
         elif bearish_criteria >= 2:
             bearish += 1
 
-        time.sleep(0.1)  # API-Schutz pro Symbol
-
     # ✅ Rückgabe am Ende – nur einmal
     if bullish >= 25:
         return "strong_bullish"
@@ -115,83 +186,133 @@ def get_market_trend(client, symbols):
 
 
 
+# Zentrales Weight-Budget für alle REST-Aufrufe (Binance-Limit: 2400/Minute)
+governor = WeightGovernor(
+    budget=int(os.getenv("BINANCE_WEIGHT_BUDGET", "1800")),
+    order_reserve=int(os.getenv("BINANCE_ORDER_RESERVE", "200")),
+    backfill_budget=int(os.getenv("BINANCE_BACKFILL_BUDGET", "600"))  # Obergrenze für Archiv-Backfill
+)
+
+SCAN_WORKERS = int(os.getenv("SCAN_WORKERS", "16"))  # parallele Symbol-Analysen pro Zyklus
+
+# Gemeinsame HTTP-Verbindungspools (Keep-Alive) für Binance und Telegram
+transport = HttpTransport(
+    pool_size=int(os.getenv("HTTP_POOL_SIZE", str(max(SCAN_WORKERS, 10)))),
+    timeout=float(os.getenv("HTTP_TIMEOUT", "5")),
+    retries=int(os.getenv("HTTP_RETRIES", "2"))
+)
+
 # Initialisiere den Binance-Client mit nur einem API-Zugang
-client = UMFutures(key=os.getenv("BINANCE_API_KEY"), secret=os.getenv("BINANCE_API_SECRET"))
+client = GovernedClient(
+    UMFutures(key=os.getenv("BINANCE_API_KEY"), secret=os.getenv("BINANCE_API_SECRET"),
+              base_url=BINANCE_REST_URL, timeout=transport.timeout),
+    governor
+)
+transport.mount(client.session)
+
+# exchange_info-Cache: Symbol-Filter und handelbare Symbole ohne Netzwerkzugriff
+exchange_meta = ExchangeInfoCache(
+    client,
+    lambda info: get_trading_symbols(info),
+    ttl=int(os.getenv("EXCHANGE_INFO_TTL", "3600")),
+    log=lambda msg: log_print(msg)
+)
 
-START_CAPITAL = 150.0
-MAX_LOSS = 30.0
 capital_lost = 0.0
 bot_active = True
 
+# Auswertung bei Kerzenschluss: pro Symbol die zuletzt ausgewertete Kerze, die Symbole knapp
+# am Signal (Fast-Path) und pro Symbol/Richtung die Kerze, für die schon ein Signal ging
+evaluated_bars = {}
+near_trigger = set()
+fired_bars = {}
+last_market_trend = "neutral"
+scan_lock = threading.Lock()
 
-app = Flask(__name__)
-log_file = open("log.txt", "a", encoding="utf-8")
-
-def log_print(msg):
-    print(msg, flush=True)
-    log_file.write(f"{msg}\n")
-    log_file.flush()
 
-# ✅ HIER EINFÜGEN:
-import csv
-from datetime import datetime
+app = Flask(__name__)
+# 🪵 Logging über Queue + Hintergrund-Thread; Detail-Ausgaben pro Symbol nur mit LOG_LEVEL=DEBUG
+logger = setup_logging(
+    path="log.txt",
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    max_bytes=int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024))),
+    backup_count=int(os.getenv("LOG_BACKUP_COUNT", "5")),
+    when=os.getenv("LOG_ROTATE_WHEN")
+)
+
+def log_print(msg, level=logging.INFO):
+    logger.log(level, msg)
+
+def log_debug(msg):
+    logger.debug(msg)
+
+# 🤖 Modell & Scaler bleiben im Speicher; neue Pickles werden automatisch nachgeladen
+ml_model = ModelServer(check_interval=float(os.getenv("ML_RELOAD_INTERVAL", "5")), log=log_print)
+
+# 📈 Metriken für /metrics (Prometheus) und /status (JSON)
+metrics = MetricsRegistry()
+klines_seconds = metrics.histogram("bot_get_klines_seconds", "REST-Latenz von /fapi/v1/klines")
+analyze_seconds = metrics.histogram("bot_analyze_symbol_seconds", "Dauer von analyze_symbol")
+cycle_seconds = metrics.histogram("bot_cycle_seconds", "Dauer eines vollständigen run_bot-Zyklus")
+order_seconds = metrics.histogram("bot_order_roundtrip_seconds", "Round-Trip der Market-Order")
+signals_total = metrics.counter("bot_signals_total", "Gesendete Signale")
+orders_total = metrics.counter("bot_orders_total", "Erfolgreich platzierte Orders")
+api_errors_total = metrics.counter("bot_api_errors_total", "Fehlgeschlagene API-Aufrufe")
+metrics.counter("bot_rate_limited_total", "Antworten mit HTTP 429/418", func=lambda: governor.backoffs)
+metrics.gauge("bot_capital_lost", "Kumulierter potenzieller Verlust (USDT)", func=lambda: capital_lost)
+metrics.gauge("bot_weight_used", "Verbrauchtes Request-Weight im aktuellen Fenster",
+              func=lambda: governor.used)
+metrics.gauge("bot_telegram_queue_depth", "Wartende Telegram-Nachrichten", func=lambda: notifier.queue_depth)
+last_cycle = metrics.gauge("bot_last_cycle_timestamp", "Unix-Zeit des letzten abgeschlossenen Zyklus")
+metrics.gauge("bot_near_trigger_symbols", "Symbole im Fast-Path (knapp am Signal)", func=lambda: len(near_trigger))
+metrics.gauge("bot_candle_store_bytes", "Speicher der Kerzen-Ringpuffer (alle Symbole)",
+              func=lambda: sum(candle_store.memory_usage().values()))
+
+# 🗓️ Scan, Labeling, Monitoring und Archiv als eigenständige Jobs an Kerzengrenzen
+SCAN_OFFSET = float(os.getenv("SCAN_OFFSET", "2"))     # Sekunden nach Minutenwechsel (Kerze geschlossen)
+scheduler = CycleScheduler(log=log_print)
+metrics.counter("bot_job_skipped_total", "Wegen laufendem Durchgang ausgelassene Job-Termine",
+                func=lambda: sum(job.skipped for job in scheduler.jobs))
+metrics.counter("bot_job_overruns_total", "Job-Läufe über ihrer Deadline",
+                func=lambda: sum(job.overruns for job in scheduler.jobs))
 
 def log_trade(symbol, direction, entry_price, qty, tp, sl, callback_rate,
               rsi, ema20, ema50, macd_line, macd_signal,
               current_volume, avg_volume, market_trend, atr, btc_strength):
+    now = datetime.now()
+    csv_log.write("trades.csv", [
+        now.strftime("%Y-%m-%d %H:%M:%S"),
+        symbol,
+        direction,
+        entry_price,
+        qty,
+        tp,
+        sl,
+        callback_rate,
+        round(rsi, 2),
+        round(ema20 - ema50, 5),
+        round(macd_line - macd_signal, 5),
+        round(current_volume / avg_volume, 3),
+        market_trend,
+        round(atr, 5),
+        round(btc_strength, 3),
+        now.weekday(),
+        now.hour
+    ], header=[
+        "timestamp", "symbol", "direction", "entry_price", "qty", "tp", "sl", "callback_rate",
+        "rsi", "ema_diff", "macd_diff", "volume_ratio", "market_trend",
+        "atr", "btc_strength", "weekday", "hour"
+    ])
 
-    filename = "trades.csv"
-    file_exists = os.path.isfile(filename)
-
-    with open(filename, mode="a", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
-
-        if not file_exists:
-            writer.writerow([
-                "timestamp", "symbol", "direction", "entry_price", "qty", "tp", "sl", "callback_rate",
-                "rsi", "ema_diff", "macd_diff", "volume_ratio", "market_trend",
-                "atr", "btc_strength", "weekday", "hour"
-            ])
-
-        writer.writerow([
-            datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            symbol,
-            direction,
-            entry_price,
-            qty,
-            tp,
-            sl,
-            callback_rate,
-            round(rsi, 2),
-            round(ema20 - ema50, 5),
-            round(macd_line - macd_signal, 5),
-            round(current_volume / avg_volume, 3),
-            market_trend,
-            round(atr, 5),
-            round(btc_strength, 3),
-            datetime.now().weekday(),
-            datetime.now().hour
-        ])
-
-import csv
-from datetime import datetime
-import os
 
 def log_trade_result(symbol, direction, entry_price, result):
-    file = "trade_log.csv"
-    exists = os.path.exists(file)
-
-    with open(file, mode="a", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
-        if not exists:
-            writer.writerow(["Zeit", "Symbol", "Richtung", "Einstiegspreis", "Ergebnis"])
-        writer.writerow([
-            datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            symbol,
-            direction,
-            round(entry_price, 4),
-            result
-        ])
+    csv_log.write("trade_log.csv", [
+        datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        symbol,
+        direction,
+        round(entry_price, 4),
+        result
+    ], header=["Zeit", "Symbol", "Richtung", "Einstiegspreis", "Ergebnis"])
 
 
 
@@ -199,60 +320,283 @@ def log_trade_result(symbol, direction, entry_price, result):
 TELEGRAM_TOKEN = os.getenv("TELEGRAM_TOKEN")
 CHAT_ID = int(os.getenv("CHAT_ID"))
 
+def post_telegram(message):
+    return transport.post(
+        f"{TELEGRAM_API_URL}/bot{TELEGRAM_TOKEN}/sendMessage",
+        json={"chat_id": CHAT_ID, "text": message, "parse_mode": "Markdown"},
+        timeout=5
+    )
+
+# Telegram läuft im Hintergrund – Signale eines Zyklus werden gebündelt verschickt
+notifier = TelegramNotifier(post_telegram, linger=float(os.getenv("TELEGRAM_LINGER", "2")), log=log_print)
+atexit.register(notifier.flush)
+
 def send_telegram(message):
+    # Nur einreihen – blockiert nie den Scan oder eine Order
+    notifier.notify(message)
+
+# 🗃️ Kline-Cache pro Zyklus: (symbol, interval, letzte geschlossene Kerze) → per REST geladenes limit.
+# Wird am Anfang jedes run_bot geleert und verfällt automatisch, sobald die nächste Kerze schliesst.
+kline_cache = {}
+kline_cache_boundary = {}
+kline_cache_lock = threading.Lock()
+
+# Kerzen aller Symbole in Ringpuffern – aus dem WebSocket-Stream (USE_STREAM) oder per REST
+candle_store = CandleStore(capacity=200)
+kline_stream = None
+
+# Abgeschlossene Kerzen dauerhaft auf Disk (nur aktiv mit USE_KLINE_ARCHIVE)
+kline_archive = KlineArchive()
+archive_queue = queue.Queue()      # abgeschlossene Stream-Kerzen für den Archiv-Thread
+archive_filled = set()             # Symbole mit abgeschlossenem erstem Backfill (fill_archive)
+
+# Indikator-Zustand pro Symbol (RSI, EMA20/50, MACD, ATR, Volumen-Schnitt)
+indicator_engines = {}
+indicator_engines_lock = threading.Lock()
+# Derselbe Zustand für den Screener, als Arrays mit einer Zeile pro Symbol (USE_SCREENER)
+screener_state = screener.ScreenerState()
+
+
+def last_closed_candle(interval, now_ms=None):
+    """
+    Open-Zeit (ms) der zuletzt geschlossenen Kerze im gegebenen Intervall.
+    Beispiel: 12:07 bei "5m" → 12:00 läuft noch, also 11:55.
+    """
+    step = INTERVAL_MS[interval]
+    if now_ms is None:
+        now_ms = int(time.time() * 1000)
+    return (now_ms // step) * step - step
+
+
+def clear_kline_cache():
+    with kline_cache_lock:
+        kline_cache.clear()
+        kline_cache_boundary.clear()
+
+
+def fetch_klines(symbol, interval="5m", limit=100, start_time=None, end_time=None, priority=SCAN):
+    """
+    Rohe Kerzen von der REST-API (ohne Cache), oder None bei Fehlern.
+    Mit start_time/end_time (ms, Eröffnungszeiten) wird ein historischer Bereich geladen.
+    """
+    url = f"{BINANCE_REST_URL}/fapi/v1/klines?symbol={symbol}&interval={interval}&limit={limit}"
+    if start_time is not None:
+        url += f"&startTime={int(start_time)}"
+    if end_time is not None:
+        url += f"&endTime={int(end_time)}"
     try:
-        requests.post(
-            f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage",
-            json={"chat_id": CHAT_ID, "text": message, "parse_mode": "Markdown"},
-            timeout=5
-        )
+        governor.acquire(kline_weight(limit), priority)
+        with klines_seconds.time():
+            res = transport.get(url)
+        governor.update(res.status_code, res.headers)
+        if res.status_code != 200:
+            api_errors_total.inc(source="klines")
+            log_print(f"{symbol}: Fehler beim Laden: HTTP {res.status_code}")
+            return None
+        return res.json()
     except Exception as e:
-        log_print(f"Telegram-Fehler: {e}")
+        api_errors_total.inc(source="klines")
+        log_print(f"{symbol}: Fehler beim Laden: {e}")
+        return None
+
+
+def backfill_rows(symbol, interval, limit, start_time=None, end_time=None, priority=SCAN):
+    # REST-Kerzen im Format des CandleStore: [timestamp, open, high, low, close, volume]
+    rows = fetch_klines(symbol, interval, limit, start_time=start_time, end_time=end_time, priority=priority)
+    if rows is None:
+        return None
+    return np.array([r[:6] for r in rows], dtype=np.float64).reshape(-1, 6)
+
+
+def archive_rows(symbol, interval, limit, start_time=None, end_time=None):
+    # Archiv-Backfill mit niedrigster Priorität, damit er den Scan nicht ausbremst
+    return backfill_rows(symbol, interval, limit, start_time, end_time, priority=BACKFILL)
+
+
+def load_candles(symbol, interval="5m", limit=100):
+    """
+    Sorgt dafür, dass der CandleStore die letzten `limit` Kerzen (inkl. laufender) enthält:
+    aus dem Live-Stream, falls er läuft und aktuell ist, sonst per REST – höchstens einmal pro
+    Zyklus und Kerze. Rückgabe: False, wenn keine Kerzen geladen werden konnten.
+    """
+    if kline_stream is not None and kline_stream.interval == interval and kline_stream.is_live():
+        current_open = last_closed_candle(interval) + INTERVAL_MS[interval]
+        last_ts = candle_store.last_timestamp(symbol, interval)
+        if last_ts is not None and last_ts >= current_open and candle_store.count(symbol, interval) >= limit:
+            return True
+
+    key = (symbol, interval, last_closed_candle(interval))
+    with kline_cache_lock:
+        if kline_cache.get(key, 0) >= limit:
+            return True
 
-def get_klines(symbol, interval="5m", limit=100):
-    url = f"https://fapi.binance.com/fapi/v1/klines?symbol={symbol}&interval={interval}&limit={limit}"
     try:
-        res = requests.get(url, timeout=5)
-        df = pd.DataFrame(res.json(), columns=[
-            'timestamp', 'open', 'high', 'low', 'close', 'volume',
-            'close_time', 'quote_asset_volume', 'number_of_trades',
-            'taker_buy_base_volume', 'taker_buy_quote_volume', 'ignore'
-        ])
-        for c in ['open', 'high', 'low', 'close', 'volume']:
-            df[c] = df[c].astype(float)
-        return df
+        rows = backfill_rows(symbol, interval, limit)
+        if rows is None:
+            return False
+        candle_store.ingest(symbol, interval, rows)
     except Exception as e:
         log_print(f"{symbol}: Fehler beim Laden: {e}")
+        return False
+
+    with kline_cache_lock:
+        # Neue Kerze geschlossen → alte Einträge dieses Intervalls verwerfen
+        if kline_cache_boundary.get(interval, 0) < key[2]:
+            for old_key in [k for k in kline_cache if k[1] == interval and k[2] < key[2]]:
+                del kline_cache[old_key]
+            kline_cache_boundary[interval] = key[2]
+        kline_cache[key] = max(limit, kline_cache.get(key, 0))
+    return True
+
+
+def candle_window(symbol, interval, limit, closed_only=False, minimum=None):
+    """
+    Zero-Copy-View (6 × n) auf die letzten `limit` Kerzen im CandleStore; mit closed_only ohne
+    die laufende Kerze, deren Werte sich bis zum Schluss noch ändern. Nur unter
+    candle_store.lock benutzen. None bei weniger als `minimum` (Standard: limit) Kerzen.
+    """
+    view = candle_store.window(symbol, interval, limit + 1 if closed_only else limit, minimum)
+    if view is None or not closed_only:
+        return view
+    closed = int(np.searchsorted(view[0], last_closed_candle(interval), side="right"))
+    view = view[:, max(0, closed - limit):closed]
+    return view if view.shape[1] >= (limit if minimum is None else minimum) else None
+
+
+def get_candles(symbol, interval="5m", limit=100, closed_only=False):
+    """
+    Die letzten `limit` Kerzen als DataFrame (Stream oder REST, siehe load_candles);
+    mit closed_only nur abgeschlossene Kerzen.
+    """
+    if not load_candles(symbol, interval, limit + 1 if closed_only else limit):
         return None
+    with candle_store.lock:
+        view = candle_window(symbol, interval, limit, closed_only, minimum=1)
+        if view is None:
+            return None
+        return pd.DataFrame(view.T.copy(), columns=FIELDS)
+
+
+def start_kline_stream(symbols, interval="5m"):
+    """
+    Startet den WebSocket-Stream für alle Symbole; Backfill beim Start über REST.
+    """
+    global kline_stream
+    kline_stream = KlineStream(symbols, interval, candle_store, backfill_rows,
+                               base_url=STREAM_URL, log=log_print,
+                               on_close=archive_candle if USE_ARCHIVE else None)
+    kline_stream.start()
+    return kline_stream
+
+
+def archive_candle(symbol, interval, row):
+    # Aufruf aus dem WebSocket-Thread: nur einreihen, geschrieben wird im Archiv-Thread
+    archive_queue.put((symbol, interval, row))
+
+
+def archive_worker():
+    """
+    Schreibt abgeschlossene Kerzen aus dem Stream ins Archiv; fehlen davor Kerzen (z. B. nach
+    einem Reconnect), werden sie zuerst über REST nachgeladen.
+    """
+    while True:
+        symbol, interval, row = archive_queue.get()
+        if symbol not in archive_filled:
+            # Erst nach dem ersten Backfill schreiben – sonst setzt fill() an dieser Kerze an und
+            # die KLINE_ARCHIVE_DAYS-Historie davor wird nie geladen. Verworfene Kerzen holt danach
+            # die Lückenfüllung unten nach.
+            continue
+        try:
+            step = INTERVAL_MS[interval]
+            last = kline_archive.last_timestamp(symbol, interval)
+            if last is not None and row[0] - last > step:
+                kline_archive.fill(symbol, interval, archive_rows, until=row[0] - step)
+            kline_archive.append(symbol, interval, [row])
+        except Exception as e:
+            log_print(f"{symbol}: ❌ Archiv-Schreiben fehlgeschlagen: {e}")
 
 
-def analyze_symbol(symbol, direction):
-    df = get_klines(symbol, limit=50)
-    if df is None or len(df) < 20:
-        return None, ["Unzureichende Daten"]
+def fill_archive(symbols, interval="5m"):
+    """
+    Bringt das Archiv aller Symbole bis zur letzten geschlossenen Kerze auf Stand;
+    leere Dateien beginnen KLINE_ARCHIVE_DAYS Tage in der Vergangenheit.
+    """
+    until = last_closed_candle(interval)
+    since = until - KLINE_ARCHIVE_DAYS * INTERVAL_MS["1d"]
+    added = 0
+    for symbol in symbols:
+        try:
+            added += kline_archive.fill(symbol, interval, archive_rows, until=until, since=since)
+            # Nur wenn der Backfill bis zur letzten geschlossenen Kerze kam (REST-Fehler brechen ab)
+            if (kline_archive.last_timestamp(symbol, interval) or 0) >= until:
+                archive_filled.add(symbol)
+        except Exception as e:
+            log_print(f"{symbol}: ❌ Archiv-Backfill fehlgeschlagen: {e}")
+    log_print(f"🗄️ Kline-Archiv aktualisiert: {added} Kerzen ({len(symbols)} Symbole)")
+
+
+def get_indicator_engine(symbol):
+    with indicator_engines_lock:
+        engine = indicator_engines.get(symbol)
+        if engine is None:
+            engine = indicator_engines[symbol] = IndicatorEngine()
+        return engine
+
 
-    # 📊 BTC-Stärke analysieren
-    btc_df = get_klines("BTCUSDT", "5m", 100)
+def get_btc_strength(closed_only=False):
+    # 📊 BTC-Stärke: Veränderung über die letzten 100 5m-Kerzen
+    btc_df = get_candles("BTCUSDT", "5m", 100, closed_only)
     if btc_df is not None and len(btc_df) >= 2:
-        btc_strength = (btc_df["close"].iloc[-1] - btc_df["close"].iloc[0]) / btc_df["close"].iloc[0]
-    else:
-        btc_strength = 0  # Fallback bei Fehlern
-
-    rsi = RSIIndicator(df['close'], window=14).rsi().iloc[-1]
-    macd_line = MACD(df['close']).macd().iloc[-1]
-    macd_signal = MACD(df['close']).macd_signal().iloc[-1]
-    ema20 = EMAIndicator(df['close'], window=20).ema_indicator().iloc[-1]
-    ema50 = EMAIndicator(df['close'], window=50).ema_indicator().iloc[-1]
-    volume = df['volume'].iloc[-1]
-    avg_volume = df['volume'].rolling(20).mean().iloc[-1]
-    price = df['close'].iloc[-1]
-    atr = (df['high'] - df['low']).rolling(14).mean().iloc[-1]
+        return (btc_df["close"].iloc[-1] - btc_df["close"].iloc[0]) / btc_df["close"].iloc[0]
+    return 0  # Fallback bei Fehlern
+
+
+def analyze_symbol(symbol, closed_only=False, btc_strength=None):
+    """
+    Lädt die Kerzen eines Symbols einmal, berechnet alle Indikatoren einmal
+    und prüft LONG und SHORT im selben Durchgang. Mit closed_only endet die Historie bei
+    der zuletzt geschlossenen Kerze statt bei der laufenden. btc_strength einmal pro Zyklus
+    vom Aufrufer; ohne Wert wird sie hier berechnet.
+    Rückgabe: {"long": (signal | None, gründe), "short": (signal | None, gründe)}
+    """
+    with analyze_seconds.time():
+        insufficient = {"long": (None, ["Unzureichende Daten"]), "short": (None, ["Unzureichende Daten"])}
+        if not load_candles(symbol, "5m", 51 if closed_only else 50):
+            return insufficient
+
+        # 📈 Indikatoren inkrementell direkt auf dem Ringpuffer: nur neu geschlossene Kerzen
+        # werden eingerechnet
+        with candle_store.lock:
+            candles = candle_window(symbol, "5m", 50, closed_only, minimum=20)
+            if candles is None:
+                return insufficient
+            values = get_indicator_engine(symbol).sync(candles)
+            candle = candles[1:, -1].copy()
+        if btc_strength is None:
+            btc_strength = get_btc_strength(closed_only)
+        return build_verdicts(symbol, candle, values, btc_strength)
+
+
+def build_verdicts(symbol, candle, values, btc_strength, failed=None):
+    """
+    Wendet die Signal-Regeln auf fertig berechnete Indikatoren an, schreibt die Logs
+    und baut die Signale. candle = (open, high, low, close, volume) der letzten Kerze,
+    failed = vorab berechnete Kriterien-Flags pro Richtung (z. B. aus dem Screener).
+    """
+    open_price, high, low, price, volume = candle
+    rsi = values["rsi"]
+    macd_line = values["macd_line"]
+    macd_signal = values["macd_signal"]
+    ema20 = values["ema20"]
+    ema50 = values["ema50"]
+    avg_volume = values["avg_volume"]
+    atr = values["atr"]
 
     # 🕯️ Candlestick-Analyse
-    candle_size = df['close'].iloc[-1] - df['open'].iloc[-1]
+    candle_size = price - open_price
     candle_direction = int(candle_size > 0)
-    total_range = df['high'].iloc[-1] - df['low'].iloc[-1]
-    candle_body_ratio = abs(df['close'].iloc[-1] - df['open'].iloc[-1]) / (total_range + 1e-6)
+    total_range = high - low
+    candle_body_ratio = abs(price - open_price) / (total_range + 1e-6)
 
     # 🌎 Handels-Session basierend auf Uhrzeit
     current_hour = datetime.now().hour
@@ -265,13 +609,24 @@ def analyze_symbol(symbol, direction):
     else:
         session = "Other"
 
-
-    reasons = []
-
-    # ML-Logging hier
+    if failed is None:
+        failed = {
+            direction: criteria_masks(direction, rsi, ema20, ema50, macd_line, macd_signal)
+            for direction in ("long", "short")
+        }
+    criteria = {direction: describe_criteria(direction, failed[direction], rsi)
+                for direction in ("long", "short")}
+
+    # ML-Logging hier – eine Zeile pro Symbol, mit der Richtung, die näher am Signal ist
+    long_failed = len(criteria["long"][1])
+    short_failed = len(criteria["short"][1])
+    if long_failed != short_failed:
+        ml_direction = "LONG" if long_failed < short_failed else "SHORT"
+    else:
+        ml_direction = "LONG" if ema20 >= ema50 else "SHORT"
     log_ml_data(
         symbol=symbol,
-        direction=direction.upper(),
+        direction=ml_direction,
         rsi=rsi,
         ema20=ema20,
         ema50=ema50,
@@ -283,102 +638,16 @@ def analyze_symbol(symbol, direction):
         price_now=price
     )
 
-    # Volumen-Filter
-    if volume < 0.5 * avg_volume:
-        reasons.append(f"Volumen zu gering ({volume:.2f} < {avg_volume:.2f})")
-        return None, reasons
-
-    # Long-Kriterien
-    if direction == "long":
-        if rsi > 33:
-            reasons.append(f"RSI zu hoch für LONG ({rsi:.2f})")
-        if ema20 <= ema50 * 0.998:
-            reasons.append("EMA20 nicht über EMA50 (mit Spielraum) für LONG")
-        if macd_line <= macd_signal:
-            reasons.append("MACD gegen LONG")
-
-        if len(reasons) == 1:
-            log_missed_trade(
-                symbol=symbol,
-                direction="LONG",
-                reasons=reasons,
-                current_price=price,
-                timestamp=datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            )
-
-    if len(reasons) == 2:
-        passed = []
-        if rsi <= 33:
-            passed.append("RSI ok")
-        if ema20 > ema50 * 0.998:
-            passed.append("EMA-Trend ok")
-        if macd_line > macd_signal:
-            passed.append("MACD ok")
-
-        log_fast_signal(
-            symbol=symbol,
-            direction="LONG",
-            passed=passed,
-            failed=reasons,
-            current_price=price,
-            timestamp=datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        )
-
-    if reasons:
-        return None, reasons
-
-    trade_direction = "open_long"
-
-    # Short-Kriterien
-    if direction == "short":
-        if rsi < 67:
-            reasons.append(f"RSI zu niedrig für SHORT ({rsi:.2f})")
-        if ema20 >= ema50 * 1.002:
-            reasons.append("EMA20 nicht unter EMA50 (mit Spielraum) für SHORT")
-        if macd_line >= macd_signal:
-            reasons.append("MACD gegen SHORT")
-
-    if len(reasons) == 1:
-        log_missed_trade(
-            symbol=symbol,
-            direction="SHORT",
-            reasons=reasons,
-            current_price=price,
-            timestamp=datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        )
-
-    if len(reasons) == 2:
-        passed = []
-        if rsi >= 67:
-            passed.append("RSI ok")
-        if ema20 < ema50 * 1.002:
-            passed.append("EMA-Trend ok")
-        if macd_line < macd_signal:
-            passed.append("MACD ok")
-
-        log_fast_signal(
-            symbol=symbol,
-            direction="SHORT",
-            passed=passed,
-            failed=reasons,
-            current_price=price,
-            timestamp=datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        )
-
-    if reasons:
-        return None, reasons
-
-    trade_direction = "open_short"
-
-    # 📌 TP/SL berechnen
-    if trade_direction == "open_long":
-        tp = price + 1.5 * atr
-        sl = price - 0.9 * atr
-    else:
-        tp = price - 1.5 * atr
-        sl = price + 0.9 * atr
+    # Volumen-Filter – gilt für beide Richtungen
+    if volume_too_low(volume, avg_volume):
+        reasons = [volume_reason(volume, avg_volume)]
+        return {"long": (None, reasons), "short": (None, reasons), "near_trigger": False}
 
-    qty = round(START_CAPITAL / price, 3)
+    # Knapp am Signal: genau ein Kriterium verfehlt, und das nur um wenig – Kandidat für den
+    # Fast-Path bis zum nächsten Schluss
+    near = any(is_near_trigger(failed[direction],
+                               near_masks(direction, rsi, ema20, ema50, macd_line, macd_signal, price))
+               for direction in ("long", "short"))
 
     features = {
         "rsi": rsi,
@@ -396,35 +665,67 @@ def analyze_symbol(symbol, direction):
         "session_us": 1 if session == "US" else 0
     }
 
-    if USE_ML:
-        ml_prediction, ml_prob = predict_signal(features)
-        ml_note = f"🤖 ML: {'JA' if ml_prediction else 'NEIN'} ({ml_prob:.2f})"
-    else:
-        ml_note = "🤖 ML: deaktiviert"
+    qty = position_size(price)
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    verdicts = {"near_trigger": near}
+
+    for direction in ("long", "short"):
+        passed, reasons = criteria[direction]
+
+        if len(reasons) == 1:
+            log_missed_trade(
+                symbol=symbol,
+                direction=direction.upper(),
+                reasons=reasons,
+                current_price=price,
+                timestamp=timestamp
+            )
+
+        if len(reasons) == 2:
+            log_fast_signal(
+                symbol=symbol,
+                direction=direction.upper(),
+                passed=passed,
+                failed=reasons,
+                current_price=price,
+                timestamp=timestamp
+            )
 
-# ✏️ Nachricht bauen
-    msg = (f"📢 *Signal {trade_direction} für {symbol}*\n"
-           f"RSI: {rsi:.2f}, EMA20/EMA50: {ema20:.2f}/{ema50:.2f}\n"
-           f"TP: {tp:.4f} | SL: {sl:.4f}\n"
-           f"{ml_note}")
+        if reasons:
+            verdicts[direction] = (None, reasons)
+            continue
+
+        trade_direction = f"open_{direction}"
+
+        # 📌 TP/SL berechnen
+        tp, sl = take_profit_stop_loss(direction, price, atr)
+
+        # ✏️ Nachricht bauen (die ML-Zeile hängt score_candidates an)
+        msg = (f"📢 *Signal {trade_direction} für {symbol}*\n"
+               f"RSI: {rsi:.2f}, EMA20/EMA50: {ema20:.2f}/{ema50:.2f}\n"
+               f"TP: {tp:.4f} | SL: {sl:.4f}")
+
+        verdicts[direction] = ({
+            "direction": trade_direction,
+            "price": price,
+            "qty": qty,
+            "tp": tp,
+            "sl": sl,
+            "msg": msg,
+            "rsi": rsi,
+            "ema20": ema20,
+            "ema50": ema50,
+            "macd_line": macd_line,
+            "macd_signal": macd_signal,
+            "volume": volume,
+            "avg_volume": avg_volume,
+            "atr": atr,
+            "btc_strength": btc_strength,
+            "features": features
+        }, [])
 
     # 🔁 Rückgabe
-    return {
-        "direction": trade_direction,
-        "qty": qty,
-        "tp": tp,
-        "sl": sl,
-        "msg": msg,
-        "rsi": rsi,
-        "ema20": ema20,
-        "ema50": ema50,
-        "macd_line": macd_line,
-        "macd_signal": macd_signal,
-        "volume": volume,
-        "avg_volume": avg_volume,
-        "atr": atr,
-        "btc_strength": btc_strength
-    }, []
+    return verdicts
 
 
 
@@ -442,26 +743,32 @@ def round_to_step(value, step):
 
 def place_order(symbol, direction, quantity, tp, sl,
                 rsi, ema20, ema50, macd_line, macd_signal,
-                current_volume, avg_volume, market_trend, atr, btc_strength):
+                current_volume, avg_volume, market_trend, atr, btc_strength, price=None):
     log_print(f"{symbol}: Starte Orderversuch mit qty={quantity}, TP={tp}, SL={sl}")
 
-    exchange_info = client.exchange_info()
-    symbol_info = next(s for s in exchange_info['symbols'] if s['symbol'] == symbol)
-    price_step = next(f for f in symbol_info['filters'] if f['filterType'] == 'PRICE_FILTER')['tickSize']
-    qty_step = next(f for f in symbol_info['filters'] if f['filterType'] == 'LOT_SIZE')['stepSize']
+    filters = exchange_meta.symbol_filters(symbol)
+    if filters is None:
+        log_print(f"{symbol}: ❌ Keine Symbol-Filter bekannt – Order nicht gesendet")
+        return
 
-    tp = round_to_step(tp, price_step)
-    sl = round_to_step(sl, price_step)
-    quantity = round_to_step(quantity, qty_step)
+    tp = round_to_step(tp, filters["tick_size"])
+    sl = round_to_step(sl, filters["tick_size"])
+    quantity = round_to_step(quantity, filters["step_size"])
 
     side = "BUY" if direction == "LONG" else "SELL"
     position = "LONG" if direction == "LONG" else "SHORT"
 
-    if quantity < 0.001:
+    if quantity < max(filters["min_qty"], 0.001):
         log_print(f"{symbol}: ❌ Ordermenge {quantity} zu klein – Order nicht gesendet")
         return
 
-    potenzieller_verlust = 0.9 * abs(tp - sl) * quantity
+    # Mindest-Ordervolumen (Menge × Signalpreis) – sonst lehnt Binance die Order ab
+    if price is not None and quantity * price < filters["min_notional"]:
+        log_print(f"{symbol}: ❌ Ordervolumen {quantity * price:.2f} unter Minimum "
+                  f"{filters['min_notional']:.2f} – Order nicht gesendet")
+        return
+
+    potenzieller_verlust = potential_loss(tp, sl, quantity)
     global capital_lost
     if capital_lost + potenzieller_verlust >= MAX_LOSS:
         log_print(f"{symbol}: ⚠️ Verlustgrenze erreicht – keine Order mehr erlaubt")
@@ -472,13 +779,14 @@ def place_order(symbol, direction, quantity, tp, sl,
 
     for attempt in range(3):
         try:
-            order = client.new_order(
-                symbol=symbol,
-                side=side,
-                positionSide=position,
-                type="MARKET",
-                quantity=quantity
-            )
+            with order_seconds.time():
+                order = client.new_order(
+                    symbol=symbol,
+                    side=side,
+                    positionSide=position,
+                    type="MARKET",
+                    quantity=quantity
+                )
 
          # Einstiegspreis aus tatsächlicher Order verwenden
             try:
@@ -489,6 +797,7 @@ def place_order(symbol, direction, quantity, tp, sl,
 
 
             capital_lost += potenzieller_verlust
+            orders_total.inc()
             log_print(f"{symbol}: ✅ Order {side} {quantity} erfolgreich")
             log_print(f"{symbol}: 📉 Kumulierter Verlust: {capital_lost:.2f} USDT")
 
@@ -539,59 +848,97 @@ def place_order(symbol, direction, quantity, tp, sl,
             break
 
         except Exception as e:
+            api_errors_total.inc(source="order")
             log_print(f"{symbol}: ❌ Order-Versuch {attempt + 1} fehlgeschlagen: {e}")
             time.sleep(2)
 
-def update_future_prices():
-    import pandas as pd
-    from datetime import datetime, timedelta
+FUTURE_HORIZON = timedelta(minutes=5)  # future_price = Schlusskurs bei timestamp + 5 min
+# Offene ML-Zeilen, die so lange nicht aufgelöst werden konnten, gelten als abgelaufen
+LABEL_EXPIRY = timedelta(hours=float(os.getenv("LABEL_EXPIRY_HOURS", "24")))
+MAX_RANGE_CANDLES = 1500                # Binance-Maximum pro klines-Request
 
-    file = "ml_log.csv"
 
-    try:
-        columns = [
-            "timestamp", "symbol", "direction", "rsi", "ema20", "ema50", "macd",
-            "volume_ratio", "atr", "market_trend", "btc_strength",
-            "weekday", "hour", "price_now", "future_price", "label"
-        ]
-        df = pd.read_csv(file, names=columns, header=None)
+def future_closes(symbol, targets):
+    """
+    Schlusskurse der 1m-Kerzen, in denen die Zeitpunkte `targets` (ms) liegen.
+    Nahe beieinander liegende Zeitpunkte teilen sich einen Range-Request (bis 1500 Kerzen);
+    fehlt eine Kerze (z. B. Symbol delistet), ist der Wert None.
+    """
+    step = INTERVAL_MS["1m"]
+    opens = sorted({int(t) // step * step for t in targets})
+    closes = {}
+    i = 0
+    while i < len(opens):
+        start = opens[i]
+        while i < len(opens) and opens[i] < start + MAX_RANGE_CANDLES * step:
+            i += 1
+        end = opens[i - 1]
+        rows = fetch_klines(symbol, "1m", (end - start) // step + 1, start_time=start, end_time=end)
+        for r in rows or []:
+            closes[int(r[0])] = float(r[4])
+    return [closes.get(int(t) // step * step) for t in targets]
+
 
+def update_future_prices():
+    """
+    Trägt future_price und label für offene ML-Zeilen nach, deren Zielkerze (timestamp + 5 min)
+    bereits geschlossen ist. Gelesen werden nur offene Zeilen (Teil-Index im FeatureStore),
+    pro Symbol ein Range-Request, geschrieben werden nur die aktualisierten Zeilen.
+    Zeilen älter als LABEL_EXPIRY (z. B. delistete Symbole) werden als abgelaufen markiert.
+    """
+    now = datetime.now()
+    cutoff = now - FUTURE_HORIZON - timedelta(minutes=1)
+    try:
+        expired = feature_store.expire(before=(now - LABEL_EXPIRY).strftime("%Y-%m-%d %H:%M:%S"))
+        if expired:
+            log_print(f"⌛ {expired} ML-Zeilen ohne future_price nach {LABEL_EXPIRY} als abgelaufen markiert")
+        pending = feature_store.pending(before=cutoff.strftime("%Y-%m-%d %H:%M:%S"))
     except Exception as e:
-        log_print(f"❌ Fehler beim Laden von ml_log.csv: {e}")
+        log_print(f"❌ Fehler beim Laden des ML-Logs: {e}")
+        return
+
+    if pending.empty:
+        log_print("ℹ️ Keine neuen future_price-Einträge nötig.")
         return
 
-    updated = 0
+    # timestamp ist lokale Zeit (datetime.now() beim Loggen) → Epoch-ms der Zielzeit
+    horizon_ms = FUTURE_HORIZON.total_seconds() * 1000
+    pending["target"] = [datetime.strptime(ts, "%Y-%m-%d %H:%M:%S").timestamp() * 1000 + horizon_ms
+                         for ts in pending["timestamp"]]
+    groups = list(pending.groupby("symbol"))
 
-    for i, row in df.iterrows():
+    def resolve(group):
+        symbol, rows = group
         try:
-            if pd.isna(row["future_price"]) and not pd.isna(row["timestamp"]):
-                timestamp_str = row["timestamp"]
-                symbol = row["symbol"]
-                ts = datetime.strptime(timestamp_str, "%Y-%m-%d %H:%M:%S")
-                if datetime.now() >= ts + timedelta(minutes=5):
-                    df_klines = get_klines(symbol, interval="1m", limit=2)
-                    if df_klines is not None and not df_klines.empty:
-                        future_price = df_klines['close'].iloc[-1]
-                        df.at[i, "future_price"] = round(future_price, 5)
-                        updated += 1
-                        log_print(f"🔁 Nachgetragen: {symbol} → future_price = {future_price}")
+            return rows.index, future_closes(symbol, rows["target"].tolist())
         except Exception as e:
-            log_print(f"⚠️ Fehler bei Zeile {i}: {e}")
-            continue
+            log_print(f"⚠️ {symbol}: future_price nicht ermittelbar: {e}")
+            return rows.index, [None] * len(rows)
 
-    if updated > 0:
-        try:
-            df.to_csv(file, index=False)
-            log_print(f"✅ {updated} future_price-Werte gespeichert.")
-        except Exception as e:
-            log_print(f"❌ Fehler beim Speichern von ml_log.csv: {e}")
-    else:
-        log_print("ℹ️ Keine neuen future_price-Einträge nötig.")
+    future = pd.Series(np.nan, index=pending.index)
+    with ThreadPoolExecutor(max_workers=SCAN_WORKERS, thread_name_prefix="labeler") as pool:
+        for index, prices in pool.map(resolve, groups):
+            future[index] = [np.nan if p is None else p for p in prices]
+
+    done = pending[future.notna()]
+    if done.empty:
+        log_print(f"ℹ️ {len(pending)} offene ML-Zeilen, noch keine Zielkerzen verfügbar.")
+        return
+
+    prices = future[done.index].round(5)
+    labels = label_rows(done["direction"], done["price_now"], prices)
+    try:
+        feature_store.set_future_prices(zip(done["id"].tolist(), prices.tolist(), labels.tolist()))
+        log_print(f"✅ {len(done)} future_price-Werte gespeichert "
+                  f"({len(groups)} Symbole, {len(pending) - len(done)} weiter offen).")
+    except Exception as e:
+        log_print(f"❌ Fehler beim Speichern im ML-Log: {e}")
 
 def monitor_trades():
     try:
         positions = client.get_position_risk()
     except Exception as e:
+        api_errors_total.inc(source="positions")
         log_print(f"❌ Fehler beim Abrufen der offenen Positionen: {e}")
         return
 
@@ -619,96 +966,275 @@ def monitor_trades():
 
 
 
+def get_trading_symbols(info):
+    # Alle handelbaren USDT-Perpetuals ohne Stablecoins
+    excluded_symbols = ["USDCUSDT", "TUSDUSDT", "DAIUSDT", "FDUSDUSDT", "BUSDUSDT", "USDPUSDT"]
+    return [s['symbol'] for s in info['symbols']
+            if s['contractType'] == "PERPETUAL"
+            and s['quoteAsset'] == "USDT"
+            and s['status'] == "TRADING"
+            and s['symbol'] not in excluded_symbols]
+
+
+def scan_symbols(symbols, max_workers=None, closed_only=False):
+    """
+    Analysiert alle Symbole parallel in einem begrenzten Thread-Pool.
+    Liefert (symbol, verdicts, fehler) in der Reihenfolge, in der die Analysen fertig werden,
+    damit Signale sofort verarbeitet werden können.
+    """
+    workers = max(1, max_workers or SCAN_WORKERS)
+
+    # BTC-Stärke einmal pro Zyklus, nicht pro Symbol
+    btc_strength = get_btc_strength(closed_only)
+
+    def analyze(sym):
+        log_debug(f"{sym}: 🔍 Analyse für LONG/SHORT")
+        return analyze_symbol(sym, closed_only, btc_strength)
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scan") as pool:
+        futures = {pool.submit(analyze, sym): sym for sym in symbols}
+        for future in as_completed(futures):
+            sym = futures[future]
+            try:
+                yield sym, future.result(), None
+            except Exception as e:
+                yield sym, None, e
+
+
+def screen_symbols(symbols, max_workers=None, bars=50, closed_only=False):
+    """
+    Batch-Variante von scan_symbols: lädt die Kerzen parallel in den CandleStore, kopiert die
+    Fenster aller Symbole mit voller Historie in eine Matrix (6 × Symbole × Kerzen) und wertet
+    sie mit dem Screener in einem
+    vektorisierten Durchgang aus. Liefert dieselben Tupel wie scan_symbols; Symbole mit
+    kürzerer Historie laufen über analyze_symbol.
+    """
+    workers = max(1, max_workers or SCAN_WORKERS)
+    btc_strength = get_btc_strength(closed_only)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scan") as pool:
+        loaded = list(pool.map(lambda sym: load_candles(sym, "5m", bars + 1 if closed_only else bars),
+                               symbols))
+
+    full, partial, views = [], [], []
+    with candle_store.lock:
+        for sym, ok in zip(symbols, loaded):
+            view = candle_window(sym, "5m", bars, closed_only) if ok else None
+            if view is not None:
+                full.append((sym, view))
+                views.append(view)
+            else:
+                partial.append(sym)
+        # Einzige Kopie: die Fenster direkt aus den Ringpuffern in die Batch-Matrix
+        candles = np.stack(views, axis=1) if views else None
+
+    if full:
+        values, failed, _ = screener.screen(candles, screener_state, [sym for sym, _ in full])
+        for i, (sym, _) in enumerate(full):
+            try:
+                verdicts = build_verdicts(
+                    sym,
+                    candles[1:, i, -1],
+                    {key: series[i] for key, series in values.items()},
+                    btc_strength,
+                    failed={d: tuple(mask[i] for mask in masks) for d, masks in failed.items()}
+                )
+                yield sym, verdicts, None
+            except Exception as e:
+                yield sym, None, e
+
+    for sym in partial:
+        try:
+            yield sym, analyze_symbol(sym, closed_only, btc_strength), None
+        except Exception as e:
+            yield sym, None, e
+
+
+def score_candidates(candidates):
+    """
+    Bewertet alle Signale eines Zyklus gemeinsam: eine Feature-Matrix, ein Scaler-Aufruf,
+    ein predict_proba. Ergebnis und ML-Zeile werden an das jeweilige Signal gehängt.
+    """
+    results = None
+    if USE_ML and candidates:
+        try:
+            results = ml_model.predict_batch(ml_model.matrix([res["features"] for res in candidates]))
+        except Exception as e:
+            log_print(f"❌ ML-Bewertung fehlgeschlagen: {e}")
+
+    for i, res in enumerate(candidates):
+        if results is not None:
+            res["ml_prediction"] = int(results[0][i])
+            res["ml_prob"] = float(results[1][i])
+            ml_note = f"🤖 ML: {'JA' if res['ml_prediction'] else 'NEIN'} ({res['ml_prob']:.2f})"
+        elif USE_ML:
+            ml_note = "🤖 ML: kein Modell geladen"
+        else:
+            ml_note = "🤖 ML: deaktiviert"
+        res["msg"] += f"\n{ml_note}"
+
+
+def handle_verdict(sym, direction, res, reasons, market_trend):
+    """
+    Verarbeitet das Ergebnis einer Richtung: Telegram-Signal und Order.
+    Rückgabe: (Signal gesendet, Order platziert) als 0/1
+    """
+    if res is None:
+        grund = ', '.join(reasons)
+        log_debug(f"{sym}: ❌ Kein gültiges {direction.upper()}-Signal – Gründe: {grund}")
+        return 0, 0
+
+    if res["direction"] == "open_long" and market_trend == "strong_bearish":
+        log_print(f"{sym}: ⛔️ LONG blockiert durch starken Bärenmarkt")
+        return 0, 0
+    if res["direction"] == "open_short" and market_trend == "strong_bullish":
+        log_print(f"{sym}: ⛔️ SHORT blockiert durch starken Bullenmarkt")
+        return 0, 0
+
+    send_telegram(res["msg"])
+
+    if not bot_active:
+        log_print(f"{sym}: 🔒 Bot nicht aktiv – keine Order trotz gültigem Signal.")
+        return 1, 0
+
+    if res.get("ml_prob") is not None and res["ml_prob"] < ML_THRESHOLD:
+        log_print(f"{sym}: 🤖 Keine Order – ML-Wahrscheinlichkeit {res['ml_prob']:.2f} < {ML_THRESHOLD:.2f}")
+        return 1, 0
+
+    place_order(
+        sym,
+        direction.upper(),
+        res["qty"],
+        res["tp"],
+        res["sl"],
+        res["rsi"],
+        res["ema20"],
+        res["ema50"],
+        res["macd_line"],
+        res["macd_signal"],
+        res["volume"],
+        res["avg_volume"],
+        market_trend,
+        res["atr"],
+        res["btc_strength"],
+        price=res["price"]
+    )
+    return 1, 1
+
+
 def run_bot():
-    log_print("🚀 run_bot gestartet")
-    log_print("📊 Starte neue Analyse...")
+    with scan_lock, cycle_seconds.time():
+        scan_cycle(closed_only=EVAL_ON_CLOSE)
+    last_cycle.set(time.time())
 
-    try:
-        info = client.exchange_info()
-    except Exception as e:
-        log_print(f"❌ exchange_info-Fehler: {e}")
+
+def run_fast_path():
+    """
+    Zwischen zwei Kerzenschlüssen: nur die Symbole, die beim letzten Schluss knapp am Signal
+    waren, auf der laufenden Kerze prüfen. Läuft der Schluss-Scan noch, entfällt der Durchgang.
+    """
+    step = INTERVAL_MS[EVAL_INTERVAL]
+    if time.time() * 1000 - (last_closed_candle(EVAL_INTERVAL) + step) < 60_000:
+        return      # Kerze hat gerade erst begonnen – der Schluss-Scan hat eben ausgewertet
+    symbols = sorted(near_trigger)
+    if not symbols or not scan_lock.acquire(blocking=False):
         return
+    try:
+        scan_cycle(symbols=symbols)
+    finally:
+        scan_lock.release()
+
+
+def scan_cycle(closed_only=False, symbols=None):
+    """
+    Ein Scan-Durchgang. closed_only: Auswertung der zuletzt geschlossenen Kerze (jedes Symbol
+    höchstens einmal pro Kerze); symbols: nur diese Symbole (Fast-Path) mit dem Markttrend
+    des letzten vollständigen Scans. Pro Symbol und Richtung geht höchstens ein Signal pro Kerze.
+    """
+    global near_trigger, last_market_trend
+    fast_path = symbols is not None
+    dedupe = closed_only or fast_path
+    if fast_path:
+        log_print(f"⚡ Fast-Path: {len(symbols)} Symbole knapp am Signal")
+    else:
+        log_print("🚀 run_bot gestartet")
+        log_print("📊 Starte neue Analyse...")
+    clear_kline_cache()
+
+    step = INTERVAL_MS[EVAL_INTERVAL]
+    bar = last_closed_candle(EVAL_INTERVAL) + (0 if closed_only else step)
+    if symbols is None:
+        symbols = exchange_meta.symbols()
+        if not symbols:
+            log_print("❌ Keine Symbole verfügbar (exchange_info nicht geladen)")
+            return
+    if closed_only:
+        symbols = [sym for sym in symbols if evaluated_bars.get(sym, -1) < bar]
+        if not symbols:
+            log_debug("Alle Symbole für diese Kerze bereits ausgewertet")
+            return
 
     try:
-        excluded_symbols = ["USDCUSDT", "TUSDUSDT", "DAIUSDT", "FDUSDUSDT", "BUSDUSDT", "USDPUSDT"]
-        symbols = [s['symbol'] for s in info['symbols']
-                   if s['contractType'] == "PERPETUAL"
-                   and s['quoteAsset'] == "USDT"
-                   and s['status'] == "TRADING"
-                   and s['symbol'] not in excluded_symbols]
 
         log_print(f"✅ {len(symbols)} Symbole geladen")
 
-        market_trend = get_market_trend(client, symbols)
-        log_print(f"⬆️ Markttrend erkannt: {market_trend.upper()}")
+        if fast_path:
+            market_trend = last_market_trend
+        else:
+            market_trend = last_market_trend = get_market_trend(client, symbols, closed_only)
+            log_print(f"⬆️ Markttrend erkannt: {market_trend.upper()}")
 
         analyzed = signals = orders = 0
-        for sym in symbols:
-            try:
-                for direction in ["long", "short"]:
-                    log_print(f"{sym}: 🔍 Analyse für {direction.upper()}")
-                    res, reasons = analyze_symbol(sym, direction)
-                    analyzed += 1
-
-                    if res is None and "Unzureichende Daten" in reasons:
-                        log_ml_data(
-                            symbol=symbol,
-                            direction=direction.upper(),
-                            rsi=rsi,
-                            ema20=ema20,
-                            ema50=ema50,
-                            macd=macd_line - macd_signal,
-                            volume_ratio=volume / avg_volume,
-                            atr=atr,
-                            market_trend="neutral",     # Optional: später mit echten Werten
-                            btc_strength=0.5,           # Optional: später dynamisch
-                            price_now=price,
-                            candle_size=candle_size,
-                            candle_direction=candle_direction,
-                            candle_body_ratio=candle_body_ratio,
-                            session=session
-                        )
-
-
-                    if res is None:
-                        grund = ', '.join(reasons)
-                        log_print(f"{sym}: ❌ Kein gültiges {direction.upper()}-Signal – Gründe: {grund}")
-                        continue
-
-                    if res["direction"] == "open_long" and market_trend == "strong_bearish":
-                        log_print(f"{sym}: ⛔️ LONG blockiert durch starken Bärenmarkt")
-                        continue
-                    if res["direction"] == "open_short" and market_trend == "strong_bullish":
-                        log_print(f"{sym}: ⛔️ SHORT blockiert durch starken Bullenmarkt")
-                        continue
-
-                    send_telegram(res["msg"])
-                    signals += 1
-
-                    if bot_active:
-                        place_order(
-                            sym,
-                            res["direction"],
-                            res["qty"],
-                            res["tp"],
-                            res["sl"],
-                            res["rsi"],
-                            res["ema20"],
-                            res["ema50"],
-                            res["macd_line"],
-                            res["macd_signal"],
-                            res["volume"],
-                            res["avg_volume"],
-                            market_trend,
-                            res["atr"],
-                            res["btc_strength"]
-                        )
-                        orders += 1
-                    else:
-                        log_print(f"{sym}: 🔒 Bot nicht aktiv – keine Order trotz gültigem Signal.")
-
-            except Exception as e:
-                log_print(f"{sym}: ❌ Analyse-Fehler: {e}")
+        candidates = []
+        near = set()
+
+        def dispatch(batch):
+            # ML-Bewertung (bei USE_ML für den ganzen Batch auf einmal), dann Telegram/Order
+            score_candidates([res for _, _, res in batch])
+            sent_total = placed_total = 0
+            for sym, direction, res in batch:
+                try:
+                    sent, placed = handle_verdict(sym, direction, res, [], market_trend)
+                    if sent and dedupe:
+                        fired_bars[(sym, direction)] = bar
+                    signals_total.inc(sent)
+                    sent_total += sent
+                    placed_total += placed
+                except Exception as e:
+                    log_print(f"{sym}: ❌ Signal-Fehler: {e}")
+            return sent_total, placed_total
+
+        scan = screen_symbols if USE_SCREENER else scan_symbols
+        for sym, verdicts, error in scan(symbols, closed_only=closed_only):
+            if error is not None:
+                log_print(f"{sym}: ❌ Analyse-Fehler: {error}")
+                continue
+            analyzed += 1
+            if closed_only:
+                evaluated_bars[sym] = bar
+            if verdicts.get("near_trigger"):
+                near.add(sym)
+
+            for direction in ("long", "short"):
+                res, reasons = verdicts[direction]
+                if res is None:
+                    handle_verdict(sym, direction, res, reasons, market_trend)
+                elif dedupe and fired_bars.get((sym, direction)) == bar:
+                    log_debug(f"{sym}: {direction.upper()}-Signal für diese Kerze bereits gesendet")
+                elif USE_ML:
+                    candidates.append((sym, direction, res))
+                else:
+                    # Ohne ML nichts zu bündeln: Signal sofort, in der Reihenfolge der Analysen
+                    sent, placed = dispatch([(sym, direction, res)])
+                    signals += sent
+                    orders += placed
+
+        if closed_only:
+            near_trigger = near
+
+        # 🤖 Mit ML: alle Kandidaten des Zyklus in einem Batch bewerten
+        sent, placed = dispatch(candidates)
+        signals += sent
+        orders += placed
 
         log_print(f"✅ Analyse abgeschlossen: {analyzed} geprüft, {signals} Signale, {orders} Orders")
 
@@ -716,14 +1242,28 @@ def run_bot():
         log_print(f"❌ Lauf-Fehler: {e}")
 
 
-def scheduler_loop():
-    while True:
-        schedule.run_pending()
-        time.sleep(1)
-
 @app.route("/")
 def home():
     return "Bot läuft"
+
+@app.route("/metrics")
+def metrics_endpoint():
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+@app.route("/status")
+def status():
+    result = metrics.status()
+    result.update({
+        "bot_active": bot_active,
+        "exchange_info_loaded_at": exchange_meta.loaded_at,
+        "stream_live": kline_stream is not None and kline_stream.is_live(),
+        "telegram": notifier.stats(),
+        "ml": ml_model.stats(),
+        "jobs": scheduler.stats(),
+        "eval_on_close": EVAL_ON_CLOSE,
+        "candle_store_bytes": candle_store.memory_usage(),   # pro Symbol
+    })
+    return jsonify(result)
     
 import socket
 
@@ -731,70 +1271,89 @@ def is_port_free(port):
     with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
         return s.connect_ex(("0.0.0.0", port)) != 0
 
-def log_fast_signal(symbol, direction, passed, failed, current_price, timestamp):
-    import os
-    import csv
-
-    filename = 'fast_signals.csv'
-    headers = ['timestamp', 'symbol', 'direction', 'current_price', 'passed_criteria', 'failed_criteria']
-
-    row = {
-        'timestamp': timestamp,
-        'symbol': symbol,
-        'direction': direction,
-        'current_price': current_price,
-        'passed_criteria': '; '.join(passed),
-        'failed_criteria': '; '.join(failed)
-    }
+def start_http_server(port=None):
+    # Flask-App (/, /metrics, /status) im Hintergrund, ohne den Scan zu blockieren
+    port = port or int(os.getenv("PORT", "8080"))
+    if not is_port_free(port):
+        log_print(f"⚠️ Port {port} belegt – Metrik-Server nicht gestartet")
+        return None
+    thread = threading.Thread(target=app.run, kwargs={"host": "0.0.0.0", "port": port, "use_reloader": False},
+                              name="http", daemon=True)
+    thread.start()
+    log_print(f"📈 Metriken unter http://0.0.0.0:{port}/metrics")
+    return thread
 
-    file_exists = os.path.isfile(filename)
-    with open(filename, 'a', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=headers)
-        if not file_exists:
-            writer.writeheader()
-        writer.writerow(row)
+def log_fast_signal(symbol, direction, passed, failed, current_price, timestamp):
+    csv_log.write('fast_signals.csv', [
+        timestamp,
+        symbol,
+        direction,
+        current_price,
+        '; '.join(passed),
+        '; '.join(failed)
+    ], header=['timestamp', 'symbol', 'direction', 'current_price', 'passed_criteria', 'failed_criteria'])
 
 def log_missed_trade(symbol, direction, reasons, current_price, timestamp):
-    import os
-    import csv
-
-    filename = 'missed_signals.csv'
-    headers = ['timestamp', 'symbol', 'direction', 'current_price', 'reasons']
-
-    row = {
-        'timestamp': timestamp,
-        'symbol': symbol,
-        'direction': direction,
-        'current_price': current_price,
-        'reasons': '; '.join(reasons)
-    }
+    csv_log.write('missed_signals.csv', [
+        timestamp,
+        symbol,
+        direction,
+        current_price,
+        '; '.join(reasons)
+    ], header=['timestamp', 'symbol', 'direction', 'current_price', 'reasons'])
+
 
-    file_exists = os.path.isfile(filename)
-    with open(filename, 'a', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=headers)
-        if not file_exists:
-            writer.writeheader()
-        writer.writerow(row)
+def handle_sigterm(signum, frame):
+    # docker stop / Dyno-Neustart senden SIGTERM; SystemExit lässt die atexit-Handler laufen
+    # (CSV- und SQLite-Zeilen schreiben, Telegram-Queue leeren, Log-Listener stoppen)
+    log_print("🛑 SIGTERM empfangen – Bot wird beendet")
+    raise SystemExit(0)
 
 
 if __name__ == "__main__":
+    signal.signal(signal.SIGTERM, handle_sigterm)
     send_telegram("🚀 Bot manuell gestartet (Live-Modus)")
 
     # 🧪 Test-Trade (nur einmal starten, danach wieder auskommentieren oder löschen)
     #place_order("BTCUSDT", "LONG", 0.001, 70000, 68000)
 
-    # Starte Bot direkt
-    run_bot()
-
-    # Wiederhole alle 1 Minuten
-    schedule.every(1).minutes.do(run_bot)
-    schedule.every(5).minutes.do(update_future_prices)
-    schedule.every(1).minutes.do(monitor_trades)
-
-    # Starte Schleife sichtbar im Terminal
-    while True:
-        schedule.run_pending()
-        time.sleep(1)
+    # 🗂️ exchange_info einmal laden, danach stündlich im Hintergrund
+    exchange_meta.start()
 
+    # 📈 /metrics und /status
+    start_http_server()
 
+    if USE_ML:
+        ml_model.load()
+
+    # 📡 Kerzen per WebSocket statt REST-Polling
+    if USE_STREAM:
+        start_kline_stream(exchange_meta.symbols())
+
+    # 🗄️ Archiv im Hintergrund auf Stand bringen; danach schreibt der Stream weiter
+    if USE_ARCHIVE:
+        threading.Thread(target=archive_worker, name="kline-archive-writer", daemon=True).start()
+        threading.Thread(target=fill_archive, args=(exchange_meta.symbols(),),
+                         name="kline-archive", daemon=True).start()
+
+    # Jeder Job in eigenem Thread; überzogene Termine werden übersprungen, nicht nachgeholt.
+    # Deadline je Job: interval - offset (z. B. 298 s für den 5m-Schluss-Scan).
+    # Bei gleichem Termin startet die kleinere Priorität zuerst (offene Positionen vor dem Scan).
+    scheduler.add("monitor", monitor_trades, 60, offset=SCAN_OFFSET, priority=0)
+    if EVAL_ON_CLOSE:
+        # Voller Scan nur bei Kerzenschluss, dazwischen jede Minute der Fast-Path
+        scheduler.add("scan", run_bot, INTERVAL_MS[EVAL_INTERVAL] / 1000, offset=SCAN_OFFSET,
+                      priority=1, immediate=True)
+        if FAST_PATH:
+            scheduler.add("fast", run_fast_path, 60, offset=SCAN_OFFSET, priority=1)
+    else:
+        scheduler.add("scan", run_bot, 60, offset=SCAN_OFFSET, priority=1, immediate=True)
+    scheduler.add("labels", update_future_prices, 300, offset=SCAN_OFFSET + 5, priority=2)
+    if USE_ARCHIVE and not USE_STREAM:
+        # Ohne Stream wird das Archiv per REST nachgeführt
+        scheduler.add("archive", lambda: fill_archive(exchange_meta.symbols()), 300,
+                      offset=SCAN_OFFSET + 10, priority=3)
+    scheduler.start()
 
+    while True:
+        time.sleep(60)
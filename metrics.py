@@ -0,0 +1,179 @@
+# metrics.py
+import bisect
+import threading
+import time
+
+# Sekunden; deckt REST-Aufrufe (ms) bis zu ganzen Scan-Zyklen (Minuten) ab
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in sorted(labels.items())) + "}"
+
+
+def _number(value):
+    if isinstance(value, int):
+        return str(value)
+    if value in (float("inf"), float("-inf")):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class Counter:
+    """
+    Zähler, optional mit Labels; mit `func` wird ein bestehender Zähler (z. B. im
+    WeightGovernor) bei jedem Abruf gelesen statt doppelt gezählt.
+    """
+
+    def __init__(self, name, help_text, func=None):
+        self.name = name
+        self.help = help_text
+        self.func = func
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(tuple(sorted(labels.items())), 0)
+
+    def samples(self):
+        if self.func is not None:
+            return [(self.name, {}, self.func())]
+        with self._lock:
+            items = list(self._values.items())
+        return [(self.name, dict(key), value) for key, value in items] or [(self.name, {}, 0)]
+
+    def snapshot(self):
+        return sum(value for _, _, value in self.samples())
+
+
+class Gauge:
+    """
+    Aktueller Wert – entweder per set() oder bei jedem Abruf aus `func` gelesen.
+    """
+
+    def __init__(self, name, help_text, func=None):
+        self.name = name
+        self.help = help_text
+        self.func = func
+        self._value = 0.0
+
+    def set(self, value):
+        self._value = value
+
+    def samples(self):
+        return [(self.name, {}, self.func() if self.func is not None else self._value)]
+
+    def snapshot(self):
+        return self.samples()[0][2]
+
+
+class Histogram:
+    """
+    Histogramm mit festen Buckets. observe() ist ein bisect plus drei Additionen unter
+    einem Lock – billig genug für jeden REST-Aufruf und jede Analyse im Scan.
+    """
+
+    def __init__(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += seconds
+            self._count += 1
+            if seconds > self._max:
+                self._max = seconds
+
+    def time(self):
+        return _Timer(self)
+
+    def samples(self):
+        with self._lock:
+            counts = list(self._counts)
+            total, count = self._sum, self._count
+        samples = []
+        cumulative = 0
+        for bound, n in zip(self.buckets + (float("inf"),), counts):
+            cumulative += n
+            samples.append((self.name + "_bucket", {"le": _number(bound)}, cumulative))
+        samples.append((self.name + "_sum", {}, total))
+        samples.append((self.name + "_count", {}, count))
+        return samples
+
+    def snapshot(self):
+        with self._lock:
+            count = self._count
+            return {
+                "count": count,
+                "avg": round(self._sum / count, 6) if count else 0.0,
+                "max": round(self._max, 6),
+            }
+
+
+class _Timer:
+    def __init__(self, histogram):
+        self.histogram = histogram
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start)
+        return False
+
+
+class MetricsRegistry:
+    """
+    Sammelt Counter, Gauges und Histogramme und gibt sie im Prometheus-Textformat
+    (render) oder als kompaktes JSON-Dict (status) aus.
+    """
+
+    def __init__(self):
+        self.started = time.time()
+        self._metrics = []
+
+    def _add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, help_text, func=None):
+        return self._add(Counter(name, help_text, func))
+
+    def gauge(self, name, help_text, func=None):
+        return self._add(Gauge(name, help_text, func))
+
+    def histogram(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        return self._add(Histogram(name, help_text, buckets))
+
+    def render(self):
+        kinds = {Counter: "counter", Gauge: "gauge", Histogram: "histogram"}
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {kinds[type(metric)]}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_labels(labels)} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+    def status(self):
+        result = {"uptime_seconds": round(time.time() - self.started, 1)}
+        for metric in self._metrics:
+            result[metric.name] = metric.snapshot()
+        return result
@@ -1,42 +1,170 @@
 # ml_predict.py
-import pandas as pd
+import os
+import threading
+import time
+
 import joblib
-from datetime import datetime
+import numpy as np
+from feature_store import FeatureStore
+
+# Exakt dieselben 8 Features (und Reihenfolge) wie in train_model.py
+FEATURES = [
+    "rsi", "ema_diff", "macd_abs", "volume_ratio",
+    "atr", "btc_strength", "weekday", "hour"
+]
+
+MODEL_PATH = os.getenv("ML_MODEL_PATH", "ml_model.pkl")
+SCALER_PATH = os.getenv("ML_SCALER_PATH", "ml_scaler.pkl")
+
+
+class ModelServer:
+    """
+    Hält Modell und Scaler im Speicher: einmal laden, danach nur noch rechnen.
+    Ändert sich eine der Pickle-Dateien (mtime), wird höchstens alle `check_interval`
+    Sekunden neu geladen; schlägt das fehl, bleibt das alte Modell aktiv.
+    predict() nimmt das Feature-Dict aus analyze_symbol oder einen Vektor in FEATURES-Reihenfolge,
+    predict_batch() eine ganze Matrix (alle Kandidaten eines Zyklus). Latenzen gelten pro Aufruf.
+    """
+
+    def __init__(self, model_path=MODEL_PATH, scaler_path=SCALER_PATH, check_interval=5.0, log=print):
+        self.model_path = model_path
+        self.scaler_path = scaler_path
+        self.check_interval = check_interval
+        self.log = log
+        self.loads = 0
+        self.load_time = 0.0        # Sekunden für das letzte Laden
+        self.predictions = 0        # bewertete Zeilen
+        self.batches = 0            # predict_batch-Aufrufe
+        self.total_latency = 0.0
+        self.last_latency = 0.0
+        self.max_latency = 0.0
+        self._loaded = None         # (model, scaler, mtimes) – wird als Ganzes getauscht
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+    def _mtimes(self):
+        return os.path.getmtime(self.model_path), os.path.getmtime(self.scaler_path)
+
+    def load(self):
+        start = time.perf_counter()
+        try:
+            mtimes = self._mtimes()
+            model = joblib.load(self.model_path)
+            scaler = joblib.load(self.scaler_path)
+        except Exception as e:
+            self.log(f"❌ ML-Modell konnte nicht geladen werden: {e}")
+            return False
+        self._loaded = (model, scaler, mtimes)
+        self.loads += 1
+        self.load_time = time.perf_counter() - start
+        self.log(f"🤖 ML-Modell geladen in {self.load_time * 1000:.1f} ms")
+        return True
+
+    def _maybe_reload(self):
+        now = time.time()
+        if now < self._next_check:
+            return
+        with self._lock:
+            if now < self._next_check:
+                return
+            self._next_check = now + self.check_interval
+            try:
+                changed = self._loaded is None or self._mtimes() != self._loaded[-1]
+            except OSError:
+                changed = False
+            if changed:
+                self.load()
+
+    @property
+    def ready(self):
+        self._maybe_reload()
+        return self._loaded is not None
+
+    def vector(self, features):
+        if isinstance(features, dict):
+            return np.array([[float(features[name]) for name in FEATURES]])
+        return np.asarray(features, dtype=np.float64).reshape(1, -1)
+
+    def matrix(self, rows):
+        # Feature-Dicts (oder Vektoren) → eine Matrix (n × 8) in FEATURES-Reihenfolge
+        return np.array([[float(row[name]) for name in FEATURES] if isinstance(row, dict) else row
+                         for row in rows], dtype=np.float64).reshape(len(rows), len(FEATURES))
+
+    def predict_batch(self, x):
+        """
+        Bewertet alle Zeilen von x (n × 8) mit einem Skalierungs- und einem predict_proba-Aufruf.
+        Gibt (predictions, Wahrscheinlichkeiten für Label=1) als Arrays zurück, oder None.
+        """
+        self._maybe_reload()
+        start = time.perf_counter()
+        loaded = self._loaded
+        if loaded is None:
+            return None
+        model, scaler, _ = loaded
+
+        proba = model.predict_proba(scaler.transform(np.asarray(x, dtype=np.float64)))
+        classes = list(model.classes_)
+        probs = proba[:, classes.index(1)] if 1 in classes else np.zeros(len(x))
+        predictions = np.asarray(model.classes_)[proba.argmax(axis=1)]
+
+        latency = time.perf_counter() - start
+        self.predictions += len(x)
+        self.batches += 1
+        self.total_latency += latency
+        self.last_latency = latency
+        self.max_latency = max(self.max_latency, latency)
+        return predictions, probs
 
-def predict_signal():
-    # Die Datei einlesen mit den richtigen Spaltennamen
-    columns = [
-        "timestamp", "symbol", "direction", "rsi", "ema20", "ema50", "macd", "volume_ratio",
-        "atr", "market_trend", "btc_strength", "weekday", "hour", "price_now", "future_price", "label"
-    ]
-    df = pd.read_csv("ml_log.csv", header=None, names=columns)
-    df["timestamp"] = pd.to_datetime(df["timestamp"], errors="coerce")
+    def predict(self, features):
+        """
+        Gibt (prediction, Wahrscheinlichkeit für Label=1) zurück, oder None ohne geladenes Modell.
+        """
+        result = self.predict_batch(self.vector(features))
+        if result is None:
+            return None
+        return int(result[0][0]), float(result[1][0])
 
-    # Nur die letzte Zeile verwenden
-    last = df.tail(1).copy()
+    def stats(self):
+        return {
+            "loaded": self._loaded is not None,
+            "loads": self.loads,
+            "load_time_ms": round(self.load_time * 1000, 3),
+            "predictions": self.predictions,
+            "batches": self.batches,
+            "avg_latency_us": round(self.total_latency / self.batches * 1e6, 1) if self.batches else 0.0,
+            "last_latency_us": round(self.last_latency * 1e6, 1),
+            "max_latency_us": round(self.max_latency * 1e6, 1),
+        }
 
-    # Feature-Engineering exakt wie im train_model.py
-    last["ema_diff"] = last["ema20"] - last["ema50"]
-    last["macd_abs"] = last["macd"].abs()
 
-    # Features auswählen
-    features = last[[
-        "rsi", "ema_diff", "macd_abs", "volume_ratio",
-        "atr", "btc_strength", "weekday", "hour"
-    ]]
+_server = None
+_store = None
 
-    # Modell & Scaler laden
-    model = joblib.load("ml_model.pkl")
-    scaler = joblib.load("ml_scaler.pkl")
 
-    # Skalieren und Vorhersage
-    features_scaled = scaler.transform(features)
-    prediction = model.predict(features_scaled)
-    proba = model.predict_proba(features_scaled)
+def predict_signal(features=None):
+    """
+    Bewertet ein Feature-Dict (bzw. ohne Argument die letzte Zeile des ML-Logs)
+    mit dem gemeinsamen, residenten ModelServer.
+    """
+    global _server, _store
+    if _server is None:
+        _server = ModelServer()
+    if features is None:
+        if _store is None:
+            _store = FeatureStore()
+        last = _store.recent(1)
+        last["ema_diff"] = last["ema20"] - last["ema50"]
+        last["macd_abs"] = last["macd"].abs()
+        features = last[FEATURES].iloc[0].to_dict()
+    return _server.predict(features)
 
-    return prediction[0], proba[0][1]
 
 if __name__ == "__main__":
-    pred, prob = predict_signal()
-    print("📊 Vorhersage:", "✅ GUTER TRADE" if pred == 1 else "❌ Kein guter Trade")
-    print(f"🔢 Wahrscheinlichkeit für Erfolg (Label=1): {prob:.2%}")
+    result = predict_signal()
+    if result is None:
+        print("❌ Kein Modell verfügbar")
+    else:
+        pred, prob = result
+        print("📊 Vorhersage:", "✅ GUTER TRADE" if pred == 1 else "❌ Kein guter Trade")
+        print(f"🔢 Wahrscheinlichkeit für Erfolg (Label=1): {prob:.2%}")
+        print(f"⏱️ {_server.stats()}")
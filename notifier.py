@@ -0,0 +1,130 @@
+# notifier.py
+import queue
+import threading
+import time
+
+TELEGRAM_MAX_LENGTH = 4096
+
+
+def coalesce(messages, max_length=TELEGRAM_MAX_LENGTH, separator="\n\n"):
+    """
+    Fasst Nachrichten zu möglichst wenigen Blöcken bis max_length Zeichen zusammen.
+    Einzelne zu lange Nachrichten werden hart geteilt.
+    """
+    chunks = []
+    current = ""
+    for message in messages:
+        while len(message) > max_length:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(message[:max_length])
+            message = message[max_length:]
+        if not current:
+            current = message
+        elif len(current) + len(separator) + len(message) <= max_length:
+            current += separator + message
+        else:
+            chunks.append(current)
+            current = message
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class TelegramNotifier:
+    """
+    Verschickt Telegram-Nachrichten in einem Hintergrund-Thread, damit der Scan und die
+    Orders nie auf Telegram warten. Nachrichten, die innerhalb von `linger` Sekunden
+    eintreffen (z. B. alle Signale eines Zyklus), werden zu einer Nachricht gebündelt.
+    Bei 429 wird `retry_after` aus der Antwort abgewartet.
+
+    send(text) muss die HTTP-Antwort (mit status_code und json()) zurückgeben.
+    """
+
+    def __init__(self, send, linger=2.0, max_length=TELEGRAM_MAX_LENGTH, log=print):
+        self.send = send
+        self.linger = linger
+        self.max_length = max_length
+        self.log = log
+        self.sent = 0
+        self.failed = 0
+        self.rate_limited = 0
+        self.last_latency = 0.0   # Sekunden von notify() bis zur Zustellung
+        self.max_latency = 0.0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="telegram", daemon=True)
+        self._thread.start()
+
+    def notify(self, text):
+        self._queue.put((time.time(), text))
+
+    @property
+    def queue_depth(self):
+        return self._queue.qsize()
+
+    def stats(self):
+        return {
+            "queue_depth": self.queue_depth,
+            "sent": self.sent,
+            "failed": self.failed,
+            "rate_limited": self.rate_limited,
+            "last_latency": round(self.last_latency, 3),
+            "max_latency": round(self.max_latency, 3),
+        }
+
+    def flush(self, timeout=10):
+        # Wartet, bis alle bisher eingereihten Nachrichten verschickt sind (z. B. beim Beenden)
+        deadline = time.time() + timeout
+        while self._queue.unfinished_tasks and time.time() < deadline:
+            time.sleep(0.05)
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.time() + self.linger
+        while True:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _deliver(self, text):
+        for _ in range(5):
+            try:
+                res = self.send(text)
+            except Exception as e:
+                self.log(f"Telegram-Fehler: {e}")
+                return False
+            if res.status_code == 429:
+                self.rate_limited += 1
+                try:
+                    retry_after = float(res.json().get("parameters", {}).get("retry_after", 1))
+                except ValueError:
+                    retry_after = 1.0
+                time.sleep(retry_after)
+                continue
+            if res.status_code >= 400:
+                self.log(f"Telegram-Fehler: HTTP {res.status_code}")
+                return False
+            return True
+        return False
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            try:
+                for chunk in coalesce([text for _, text in batch], self.max_length):
+                    if self._deliver(chunk):
+                        self.sent += 1
+                    else:
+                        self.failed += 1
+                latency = time.time() - batch[0][0]
+                self.last_latency = latency
+                self.max_latency = max(self.max_latency, latency)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
@@ -0,0 +1,162 @@
+# rate_limiter.py
+import threading
+import time
+
+# Prioritäten: Orders kommen immer vor dem Scan-Traffic, Archiv-Backfill zuletzt
+ORDER = 0
+SCAN = 1
+BACKFILL = 2
+
+WEIGHT_HEADER = "x-mbx-used-weight-1m"
+
+
+def kline_weight(limit):
+    """
+    Request-Weight von /fapi/v1/klines abhängig vom limit (laut Binance-Doku).
+    """
+    if limit < 100:
+        return 1
+    if limit < 500:
+        return 2
+    if limit <= 1000:
+        return 5
+    return 10
+
+
+class WeightGovernor:
+    """
+    Zentrales Weight-Budget für alle REST-Aufrufe an Binance.
+
+    Jeder Aufruf reserviert vorher sein Gewicht mit acquire(); die Antwort-Header
+    (X-MBX-USED-WEIGHT-1M) korrigieren danach den Stand. Scan-Traffic darf nur
+    budget - order_reserve verbrauchen und wartet, solange eine Order ansteht.
+    Backfill-Traffic (Kline-Archiv) wartet, solange Orders oder Scan-Aufrufe anstehen, und
+    startet nur, solange das Minutengewicht unter backfill_budget liegt – der Rest bleibt dem Scan.
+    Bei 429/418 wird bis Retry-After pausiert (ohne Header: exponentiell).
+    """
+
+    def __init__(self, budget=1800, order_reserve=200, window=60, backfill_budget=600):
+        self.budget = budget
+        self.order_reserve = order_reserve
+        self.backfill_budget = min(backfill_budget, budget - order_reserve)
+        self.window = window
+        self.used = 0
+        self.banned_until = 0.0
+        self.throttled = 0       # wie oft ein Aufruf auf Budget warten musste
+        self.backoffs = 0        # Anzahl 429/418-Antworten
+        self._window_start = 0.0
+        self._waiting = {ORDER: 0, SCAN: 0, BACKFILL: 0}
+        self._backoff_step = 0
+        self._cond = threading.Condition()
+
+    def _roll_window(self, now):
+        # Binance zählt das Gewicht pro Kalenderminute
+        start = now - (now % self.window)
+        if start > self._window_start:
+            self._window_start = start
+            self.used = 0
+
+    def _limit(self, priority):
+        if priority == ORDER:
+            return self.budget
+        if priority == SCAN:
+            return self.budget - self.order_reserve
+        return self.backfill_budget
+
+    def _ahead(self, priority):
+        # Wartende Aufrufe mit höherer Priorität
+        return any(count for p, count in self._waiting.items() if p < priority)
+
+    def acquire(self, weight=1, priority=SCAN):
+        with self._cond:
+            self._waiting[priority] += 1
+            try:
+                waited = False
+                while True:
+                    now = time.time()
+                    self._roll_window(now)
+                    limit = self._limit(priority)
+
+                    if now < self.banned_until:
+                        wait = self.banned_until - now
+                    elif self._ahead(priority):
+                        wait = 0.05
+                    elif self.used + weight > limit:
+                        wait = self._window_start + self.window - now
+                    else:
+                        self.used += weight
+                        if waited:
+                            self.throttled += 1
+                        return
+                    waited = True
+                    self._cond.wait(max(wait, 0.01))
+            finally:
+                self._waiting[priority] -= 1
+                self._cond.notify_all()
+
+    def update(self, status_code, headers):
+        """
+        Übernimmt den Stand aus einer Binance-Antwort und startet bei 429/418 den Backoff.
+        """
+        with self._cond:
+            now = time.time()
+            self._roll_window(now)
+            used = headers.get(WEIGHT_HEADER) if headers is not None else None
+            if used is not None:
+                try:
+                    self.used = max(self.used, int(used))
+                except ValueError:
+                    pass
+
+            if status_code in (418, 429):
+                self.backoffs += 1
+                retry_after = headers.get("retry-after") if headers is not None else None
+                try:
+                    pause = float(retry_after)
+                except (TypeError, ValueError):
+                    pause = min(2 ** self._backoff_step, 60)
+                    self._backoff_step += 1
+                self.banned_until = max(self.banned_until, now + pause)
+            elif status_code < 400:
+                self._backoff_step = 0
+            self._cond.notify_all()
+
+    def response_hook(self, response, *args, **kwargs):
+        # Als requests-Hook für die Session des Binance-Clients
+        self.update(response.status_code, response.headers)
+        return response
+
+
+class GovernedClient:
+    """
+    Dünne Hülle um UMFutures: jeder Aufruf läuft vorher durch den WeightGovernor.
+    Nicht aufgeführte Methoden werden mit Gewicht 1 als Scan-Traffic behandelt.
+    """
+
+    WEIGHTS = {
+        "exchange_info": (1, SCAN),
+        "ticker_24hr_price_change": (40, SCAN),
+        "new_order": (0, ORDER),
+        "cancel_order": (1, ORDER),
+        "get_position_risk": (5, ORDER),
+    }
+
+    def __init__(self, client, governor):
+        self._client = client
+        self._governor = governor
+        client.session.hooks["response"].append(governor.response_hook)
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if not callable(attr):
+            return attr
+
+        def governed(*args, **kwargs):
+            if name == "klines":
+                weight, priority = kline_weight(kwargs.get("limit", 500)), SCAN
+            else:
+                weight, priority = self.WEIGHTS.get(name, (1, SCAN))
+            self._governor.acquire(weight, priority)
+            return attr(*args, **kwargs)
+
+        return governed
@@ -0,0 +1,168 @@
+# scheduler.py
+import threading
+import time
+
+
+class Job:
+    def __init__(self, name, func, interval, offset=0.0, priority=1, deadline=None, immediate=False):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.offset = offset
+        self.priority = priority
+        # Standard: bis zur nächsten vollen Grenze (ohne offset), z. B. 58 s bei interval=60, offset=2
+        self.deadline = deadline or (interval - offset if 0 <= offset < interval else interval)
+        self.immediate = immediate
+        self.runs = 0
+        self.errors = 0
+        self.skipped = 0            # ausgelassene Termine, weil der vorige Lauf noch lief
+        self.overruns = 0           # Läufe länger als die Deadline
+        self.last_lag = 0.0         # Start - geplanter Termin (s)
+        self.max_lag = 0.0
+        self.last_duration = 0.0
+        self.max_duration = 0.0
+        self.total_duration = 0.0
+        self.last_error = None
+        self.next_run = None
+        self.skip_next = False      # nach Deadline-Überschreitung den nächsten Termin auslassen
+        self.busy_skips = 0         # Termine, die während des laufenden Durchgangs ausgelassen wurden
+
+    def next_boundary(self, now):
+        # Nächster Termin auf der Wanduhr: Vielfaches von interval (UTC-Epoche) plus offset
+        return (int((now - self.offset) // self.interval) + 1) * self.interval + self.offset
+
+    def stats(self):
+        return {
+            "runs": self.runs,
+            "errors": self.errors,
+            "skipped": self.skipped,
+            "overruns": self.overruns,
+            "last_lag": round(self.last_lag, 3),
+            "max_lag": round(self.max_lag, 3),
+            "last_duration": round(self.last_duration, 3),
+            "max_duration": round(self.max_duration, 3),
+            "avg_duration": round(self.total_duration / self.runs, 3) if self.runs else 0.0,
+            "next_run": self.next_run,
+            "last_error": self.last_error,
+        }
+
+
+class CycleScheduler:
+    """
+    Ein Dispatcher-Thread weckt die Jobs auf Kerzengrenzen der Wanduhr (z. B. interval=60,
+    offset=2 → jeweils 2 s nach jeder vollen Minute); jeder Durchgang läuft dann in einem
+    eigenen Thread. Ein Job überlappt nie mit sich selbst: Termine, die während eines laufenden
+    Durchgangs fällig werden, werden übersprungen und geloggt statt nachgeholt; nach einer
+    Deadline-Überschreitung wird genau ein Termin ausgelassen (der nächste, falls nicht schon
+    einer während des Laufs entfallen ist). Die Deadline ist standardmässig interval - offset. Ein langsamer Scan verzögert damit
+    weder das Positions-Monitoring noch stauen sich Läufe auf.
+
+    Fallen mehrere Jobs auf denselben Termin, startet der Dispatcher sie nacheinander in der
+    Reihenfolge ihrer `priority` (kleiner zuerst) und wartet jeweils, bis der Job begonnen hat.
+    """
+
+    def __init__(self, log=print, clock=time.time, sleep=None):
+        self.log = log
+        self.clock = clock
+        self.jobs = []
+        self._stop = threading.Event()
+        self._sleep = sleep or self._stop.wait
+        self._dispatcher = None
+        self._running = {}          # Job-Name → Thread des laufenden Durchgangs
+
+    def add(self, name, func, interval, offset=0.0, priority=1, deadline=None, immediate=False):
+        job = Job(name, func, interval, offset, priority, deadline, immediate)
+        self.jobs.append(job)
+        return job
+
+    def run_once(self, job, scheduled, started=None):
+        """
+        Führt einen Durchgang aus und aktualisiert Lag, Dauer und Overrun-Zähler.
+        started (Event) wird gesetzt, sobald der Job begonnen hat.
+        """
+        start = self.clock()
+        job.last_lag = max(0.0, start - scheduled)
+        job.max_lag = max(job.max_lag, job.last_lag)
+        if started is not None:
+            started.set()
+        try:
+            job.func()
+            job.last_error = None
+        except Exception as e:
+            job.errors += 1
+            job.last_error = str(e)
+            self.log(f"❌ Job {job.name} fehlgeschlagen: {e}")
+        end = self.clock()
+        duration = end - start
+        job.runs += 1
+        job.last_duration = duration
+        job.max_duration = max(job.max_duration, duration)
+        job.total_duration += duration
+        if duration > job.deadline:
+            job.overruns += 1
+            # Pro Overrun wird genau ein Termin ausgelassen – war es schon einer während des Laufs,
+            # geht es am nächsten Termin normal weiter
+            job.skip_next = not job.busy_skips
+            self.log(f"⏱️ Job {job.name} hat die Deadline überschritten ({duration:.1f}s > {job.deadline:.0f}s)"
+                     + (", nächster Termin wird ausgelassen" if job.skip_next else ""))
+
+    def _skip(self, job, reason):
+        job.skipped += 1
+        self.log(f"⏭️ Job {job.name}: Termin übersprungen ({reason})")
+
+    def dispatch(self, now):
+        """
+        Startet alle fälligen Jobs in Prioritätsreihenfolge und plant ihren nächsten Termin.
+        """
+        due = sorted((job for job in self.jobs if job.next_run <= now), key=lambda j: (j.priority, j.next_run))
+        for job in due:
+            scheduled = job.next_run
+            job.next_run = job.next_boundary(now)
+            thread = self._running.get(job.name)
+            if thread is not None and thread.is_alive():
+                job.busy_skips += 1
+                job.skip_next = False       # dieser Termin zählt schon als der ausgelassene
+                self._skip(job, "voriger Lauf läuft noch")
+                continue
+            if job.skip_next:
+                job.skip_next = False
+                self._skip(job, "nach Deadline-Überschreitung")
+                continue
+            job.busy_skips = 0
+            started = threading.Event()
+            thread = threading.Thread(target=self.run_once, args=(job, scheduled, started),
+                                      name=f"job-{job.name}", daemon=True)
+            self._running[job.name] = thread
+            thread.start()
+            started.wait()
+
+    def _loop(self):
+        now = self.clock()
+        for job in self.jobs:
+            job.next_run = now if job.immediate else job.next_boundary(now)
+        while not self._stop.is_set():
+            delay = min(job.next_run for job in self.jobs) - self.clock()
+            if delay > 0 and self._sleep(delay):
+                break
+            if self._stop.is_set():
+                break
+            self.dispatch(self.clock())
+
+    def start(self):
+        self._stop.clear()
+        self._dispatcher = threading.Thread(target=self._loop, name="scheduler", daemon=True)
+        self._dispatcher.start()
+        names = ", ".join(f"{j.name}/{j.interval:.0f}s" for j in sorted(self.jobs, key=lambda j: j.priority))
+        self.log(f"🗓️ Scheduler gestartet: {names}")
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._dispatcher is not None:
+            self._dispatcher.join(timeout)
+            self._dispatcher = None
+        for thread in list(self._running.values()):
+            thread.join(timeout)
+        self._running = {}
+
+    def stats(self):
+        return {job.name: job.stats() for job in self.jobs}
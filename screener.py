@@ -0,0 +1,230 @@
+# screener.py
+import numpy as np
+
+from indicators import EMA
+from signal_rules import criteria_masks, volume_too_low
+
+MACD_FAST, MACD_SLOW, MACD_SIGN = 12, 26, 9
+
+
+class _EMAs:
+    """
+    indicators.EMA für viele Symbole: ein Wert und ein Zähler pro Zeile, gleiche Rechenschritte,
+    damit die Werte bitgenau übereinstimmen.
+    """
+
+    def __init__(self, span=None, alpha=None, min_periods=None):
+        template = EMA(span=span, alpha=alpha, min_periods=min_periods)
+        self.alpha = template.alpha
+        self.min_periods = template.min_periods
+        self.value = np.empty(0)
+        self.count = np.empty(0, dtype=np.int64)
+
+    def grow(self, n):
+        self.value = np.concatenate((self.value, np.full(n, np.nan)))
+        self.count = np.concatenate((self.count, np.zeros(n, dtype=np.int64)))
+
+    def reset(self, rows):
+        self.value[rows] = np.nan
+        self.count[rows] = 0
+
+    def _next(self, rows, x):
+        w = self.value[rows]
+        old_wt = 1. - self.alpha
+        with np.errstate(invalid="ignore"):
+            w = np.where(w != x, (old_wt * w + self.alpha * x) / (old_wt + self.alpha), w)
+        return np.where(self.count[rows] == 0, x, w)
+
+    def update(self, rows, x):
+        self.value[rows] = self._next(rows, x)
+        self.count[rows] += 1
+
+    def peek(self, rows, x):
+        return np.where(self.count[rows] + 1 >= self.min_periods, self._next(rows, x), np.nan)
+
+
+class _RollingMeans:
+    """
+    indicators.RollingMean für viele Symbole: die letzten window - 1 Werte als Ring pro Zeile,
+    Summe mit Kahan-Korrektur in derselben Reihenfolge wie im Einzel-Objekt.
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self.values = np.empty((0, window - 1))
+        self.stored = np.empty(0, dtype=np.int64)
+        self.head = np.empty(0, dtype=np.int64)     # Position des ältesten Werts
+        self.sum = np.empty(0)
+        self.comp = np.empty(0)
+
+    def grow(self, n):
+        self.values = np.concatenate((self.values, np.zeros((n, self.window - 1))))
+        for name in ("stored", "head"):
+            setattr(self, name, np.concatenate((getattr(self, name), np.zeros(n, dtype=np.int64))))
+        for name in ("sum", "comp"):
+            setattr(self, name, np.concatenate((getattr(self, name), np.zeros(n))))
+
+    def reset(self, rows):
+        self.stored[rows] = 0
+        self.head[rows] = 0
+        self.sum[rows] = 0.0
+        self.comp[rows] = 0.0
+
+    def _add(self, rows, x, mask=None):
+        total, comp = self.sum[rows], self.comp[rows]
+        y = x - comp
+        t = total + y
+        new_comp = (t - total) - y
+        if mask is not None:
+            t = np.where(mask, t, total)
+            new_comp = np.where(mask, new_comp, comp)
+        self.sum[rows] = t
+        self.comp[rows] = new_comp
+
+    def update(self, rows, x):
+        # Wie RollingMean.update: anhängen, addieren, bei vollem Ring den ältesten Wert abziehen
+        size = self.window - 1
+        full = self.stored[rows] == size
+        head = self.head[rows]
+        oldest = self.values[rows, head]
+        self.values[rows, np.where(full, head, (head + self.stored[rows]) % size)] = x
+        self._add(rows, x)
+        self._add(rows, -oldest, full)
+        self.head[rows] = np.where(full, (head + 1) % size, head)
+        self.stored[rows] = np.minimum(self.stored[rows] + 1, size)
+
+    def peek(self, rows, x):
+        return np.where(self.stored[rows] < self.window - 1, np.nan, (self.sum[rows] + x) / self.window)
+
+
+class ScreenerState:
+    """
+    Das vektorisierte Gegenstück zu IndicatorEngine: der Indikator-Zustand (EMA, Wilder-RSI,
+    MACD, gleitende Mittel) aller Symbole als Arrays mit einer Zeile pro Symbol. Jede
+    abgeschlossene Kerze wird genau einmal eingerechnet – für alle Symbole in einem Schritt –,
+    die laufende Kerze nur über snapshot(). Bei gleicher Kerzenhistorie liefert sync() dieselben
+    Werte wie IndicatorEngine.sync() pro Symbol, auch über viele Zyklen hinweg.
+    """
+
+    def __init__(self):
+        self.rows = {}
+        self.last_ts = np.empty(0)
+        self.ema20 = _EMAs(span=20)
+        self.ema50 = _EMAs(span=50)
+        self.macd_fast = _EMAs(span=MACD_FAST)
+        self.macd_slow = _EMAs(span=MACD_SLOW)
+        self.macd_signal = _EMAs(span=MACD_SIGN)
+        self.rsi_up = _EMAs(alpha=1 / 14, min_periods=14)
+        self.rsi_down = _EMAs(alpha=1 / 14, min_periods=14)
+        self.prev_close = np.empty(0)
+        self.atr = _RollingMeans(14)
+        self.volume = _RollingMeans(20)
+
+    def _parts(self):
+        return (self.ema20, self.ema50, self.macd_fast, self.macd_slow, self.macd_signal,
+                self.rsi_up, self.rsi_down, self.atr, self.volume)
+
+    def index(self, symbols):
+        """
+        Zeilennummern der Symbole; unbekannte Symbole bekommen eine neue, leere Zeile.
+        """
+        new = [symbol for symbol in dict.fromkeys(symbols) if symbol not in self.rows]
+        if new:
+            for symbol in new:
+                self.rows[symbol] = len(self.rows)
+            for part in self._parts():
+                part.grow(len(new))
+            self.last_ts = np.concatenate((self.last_ts, np.full(len(new), np.nan)))
+            self.prev_close = np.concatenate((self.prev_close, np.full(len(new), np.nan)))
+        return np.array([self.rows[symbol] for symbol in symbols], dtype=np.int64)
+
+    def reset(self, rows):
+        for part in self._parts():
+            part.reset(rows)
+        self.last_ts[rows] = np.nan
+        self.prev_close[rows] = np.nan
+
+    def _moves(self, rows, close):
+        # Erste Kerze: Differenz NaN → wie in RSI als 0.0 gezählt
+        diff = close - self.prev_close[rows]
+        with np.errstate(invalid="ignore"):
+            return np.where(diff > 0, diff, 0.0), np.where(diff < 0, -diff, 0.0)
+
+    def _macd_line(self, rows, close):
+        return self.macd_fast.peek(rows, close) - self.macd_slow.peek(rows, close)
+
+    def update(self, rows, ts, high, low, close, volume):
+        up, down = self._moves(rows, close)
+        self.rsi_up.update(rows, up)
+        self.rsi_down.update(rows, down)
+        self.prev_close[rows] = close
+        self.ema20.update(rows, close)
+        self.ema50.update(rows, close)
+        line = self._macd_line(rows, close)
+        self.macd_fast.update(rows, close)
+        self.macd_slow.update(rows, close)
+        valid = ~np.isnan(line)
+        self.macd_signal.update(rows[valid], line[valid])
+        self.atr.update(rows, high - low)
+        self.volume.update(rows, volume)
+        self.last_ts[rows] = ts
+
+    def snapshot(self, rows, high, low, close, volume):
+        up, down = self._moves(rows, close)
+        emaup = self.rsi_up.peek(rows, up)
+        emadn = self.rsi_down.peek(rows, down)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rsi = np.where(emadn == 0, 100.0, 100 - (100 / (1 + emaup / emadn)))
+        line = self._macd_line(rows, close)
+        signal = np.where(np.isnan(line), np.nan, self.macd_signal.peek(rows, line))
+        return {
+            "rsi": np.where(np.isnan(emadn), np.nan, rsi),
+            "ema20": self.ema20.peek(rows, close),
+            "ema50": self.ema50.peek(rows, close),
+            "macd_line": line,
+            "macd_signal": signal,
+            "atr": self.atr.peek(rows, high - low),
+            "avg_volume": self.volume.peek(rows, volume),
+        }
+
+    def sync(self, symbols, candles):
+        """
+        candles: 6 × Symbole × n, letzte Kerze = laufende Kerze. Rechnet pro Symbol alle noch nicht
+        gesehenen abgeschlossenen Kerzen ein – bei einer Lücke wird die Zeile aus dem Fenster neu
+        aufgebaut – und liefert die Werte inkl. laufender Kerze (ein Array pro Indikator).
+        """
+        rows = self.index(symbols)
+        ts = candles[0]
+        n = ts.shape[1]
+        last = self.last_ts[rows]
+        known = ts[:, :n - 1] == last[:, None]
+        has_known = known.any(axis=1)
+        seen = ~np.isnan(last)
+        nothing_new = seen & ~has_known & (ts[:, n - 1] <= np.where(seen, last, 0))
+        start = np.where(has_known, known.argmax(axis=1) + 1, np.where(nothing_new, n - 1, 0))
+        self.reset(rows[seen & ~has_known & ~nothing_new])
+        for j in range(int(start.min()) if len(start) else n - 1, n - 1):
+            active = start <= j
+            column = candles[:, active, j]
+            self.update(rows[active], column[0], *column[2:])
+        return self.snapshot(rows, *candles[2:, :, n - 1])
+
+
+def screen(candles, state=None, symbols=None):
+    """
+    Berechnet alle Indikatoren und wendet die LONG/SHORT-Regeln als Masken an.
+    candles: 6 × Symbole × Kerzen, letzte Kerze = laufende Kerze. Mit `state` (ScreenerState)
+    und `symbols` läuft der Indikator-Zustand über die Zyklen weiter wie die IndicatorEngine in
+    analyze_symbol; ohne wird jedes Fenster wie von einer frischen IndicatorEngine ausgewertet.
+    Rückgabe: (Indikatoren, {"long": (rsi, ema, macd), "short": ...} nicht erfüllte
+    Kriterien als Masken, Maske für zu geringes Volumen).
+    """
+    if state is None:
+        state = ScreenerState()
+    if symbols is None:
+        symbols = list(range(candles.shape[1]))
+    values = state.sync(symbols, candles)
+    args = (values["rsi"], values["ema20"], values["ema50"], values["macd_line"], values["macd_signal"])
+    failed = {direction: criteria_masks(direction, *args) for direction in ("long", "short")}
+    low_volume = volume_too_low(candles[5, :, -1], values["avg_volume"])
+    return values, failed, low_volume
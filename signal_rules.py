@@ -0,0 +1,121 @@
+# signal_rules.py
+# Signal-Regeln von analyze_symbol – funktionieren mit Skalaren und mit NumPy-Arrays
+
+RSI_LONG_MAX = 33
+RSI_SHORT_MIN = 67
+EMA_LONG_FACTOR = 0.998
+EMA_SHORT_FACTOR = 1.002
+MIN_VOLUME_RATIO = 0.5
+
+# Fast-Path: so weit darf ein verfehltes Kriterium jenseits seiner Grenze liegen, um als knapp zu gelten
+NEAR_RSI_POINTS = 3.0       # RSI-Punkte über 33 (LONG) bzw. unter 67 (SHORT)
+NEAR_EMA_GAP = 0.001        # EMA20 relativ zu EMA50 (0.1 %) jenseits des Spielraums
+NEAR_MACD_GAP = 0.0002      # MACD-Linie relativ zum Kurs (0.02 %) jenseits der Signallinie
+
+# Risiko: Einsatz pro Trade und Obergrenze für den kumulierten potenziellen Verlust
+START_CAPITAL = 150.0
+MAX_LOSS = 30.0
+
+
+def criteria_masks(direction, rsi, ema20, ema50, macd_line, macd_signal):
+    """
+    Nicht erfüllte Kriterien als (rsi, ema, macd). Bei Arrays jeweils eine boolesche Maske.
+    """
+    if direction == "long":
+        return (rsi > RSI_LONG_MAX,
+                ema20 <= ema50 * EMA_LONG_FACTOR,
+                macd_line <= macd_signal)
+    return (rsi < RSI_SHORT_MIN,
+            ema20 >= ema50 * EMA_SHORT_FACTOR,
+            macd_line >= macd_signal)
+
+
+def near_masks(direction, rsi, ema20, ema50, macd_line, macd_signal, price):
+    """
+    Kriterien, die erfüllt oder höchstens knapp verfehlt sind, als (rsi, ema, macd) –
+    gleiche Reihenfolge wie criteria_masks.
+    """
+    if direction == "long":
+        return (rsi <= RSI_LONG_MAX + NEAR_RSI_POINTS,
+                ema20 > ema50 * (EMA_LONG_FACTOR - NEAR_EMA_GAP),
+                macd_line > macd_signal - NEAR_MACD_GAP * price)
+    return (rsi >= RSI_SHORT_MIN - NEAR_RSI_POINTS,
+            ema20 < ema50 * (EMA_SHORT_FACTOR + NEAR_EMA_GAP),
+            macd_line < macd_signal + NEAR_MACD_GAP * price)
+
+
+def is_near_trigger(failed, near):
+    """
+    Genau ein Kriterium verfehlt, und das nur knapp (Flags aus criteria_masks und near_masks).
+    """
+    return sum(bool(f) for f in failed) == 1 and all(n for f, n in zip(failed, near) if f)
+
+
+def describe_criteria(direction, failed, rsi):
+    """
+    Übersetzt die Kriterien-Flags eines Symbols in (bestandene Kriterien, Gründe).
+    """
+    failed_rsi, failed_ema, failed_macd = failed
+    passed = []
+    reasons = []
+    if direction == "long":
+        if failed_rsi:
+            reasons.append(f"RSI zu hoch für LONG ({rsi:.2f})")
+        else:
+            passed.append("RSI ok")
+        if failed_ema:
+            reasons.append("EMA20 nicht über EMA50 (mit Spielraum) für LONG")
+        else:
+            passed.append("EMA-Trend ok")
+        if failed_macd:
+            reasons.append("MACD gegen LONG")
+        else:
+            passed.append("MACD ok")
+    else:
+        if failed_rsi:
+            reasons.append(f"RSI zu niedrig für SHORT ({rsi:.2f})")
+        else:
+            passed.append("RSI ok")
+        if failed_ema:
+            reasons.append("EMA20 nicht unter EMA50 (mit Spielraum) für SHORT")
+        else:
+            passed.append("EMA-Trend ok")
+        if failed_macd:
+            reasons.append("MACD gegen SHORT")
+        else:
+            passed.append("MACD ok")
+    return passed, reasons
+
+
+def check_criteria(direction, rsi, ema20, ema50, macd_line, macd_signal):
+    """
+    Prüft die drei Signal-Kriterien einer Richtung.
+    Rückgabe: (bestandene Kriterien, Gründe für nicht erfüllte Kriterien)
+    """
+    failed = criteria_masks(direction, rsi, ema20, ema50, macd_line, macd_signal)
+    return describe_criteria(direction, failed, rsi)
+
+
+def volume_too_low(volume, avg_volume):
+    return volume < MIN_VOLUME_RATIO * avg_volume
+
+
+def volume_reason(volume, avg_volume):
+    return f"Volumen zu gering ({volume:.2f} < {avg_volume:.2f})"
+
+
+def take_profit_stop_loss(direction, price, atr):
+    # 📌 TP/SL: 1.5 × ATR Gewinnziel, 0.9 × ATR Stop
+    if direction == "long":
+        return price + 1.5 * atr, price - 0.9 * atr
+    return price - 1.5 * atr, price + 0.9 * atr
+
+
+def position_size(price):
+    quantity = START_CAPITAL / price
+    return quantity.round(3) if hasattr(quantity, "round") else round(quantity, 3)
+
+
+def potential_loss(tp, sl, quantity):
+    # Wird pro Order auf capital_lost addiert; ab MAX_LOSS keine neuen Orders mehr
+    return 0.9 * abs(tp - sl) * quantity
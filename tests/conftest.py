@@ -0,0 +1,6 @@
+# conftest.py
+import os
+import sys
+
+# Die Bot-Module liegen flach im Repo-Verzeichnis
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,34 @@
+# test_backtest.py
+import numpy as np
+
+import backtest
+from indicators import IndicatorEngine
+
+
+def test_indicator_paths_match_engine():
+    # Zustand über die gesamte Historie, auch bei unterschiedlich langen Symbolen
+    data = backtest.synthetic_data(symbols=3, bars=400, seed=3)
+    data["SYM001USDT"] = data["SYM001USDT"][:, :250]
+    paths = backtest.indicator_paths(data)
+    for symbol, candles in data.items():
+        _, _, high, low, close, volume = candles
+        engine = IndicatorEngine()
+        assert len(paths[symbol]["rsi"]) == candles.shape[1]
+        for i in range(candles.shape[1]):
+            values = engine.snapshot(high[i], low[i], close[i], volume[i])
+            for key, value in values.items():
+                got = paths[symbol][key][i]
+                assert got == value or (np.isnan(got) and np.isnan(value)), (symbol, key, i)
+            engine.update(candles[0, i], high[i], low[i], close[i], volume[i])
+
+
+def test_no_signals_before_full_window():
+    data = backtest.synthetic_data(symbols=5, bars=2000, seed=5)
+    trades, _, _ = backtest.run_backtest(data, max_loss=None)
+    assert (trades["entry_idx"] >= backtest.WINDOW - 1).all()
+
+
+def test_empty_input():
+    trades, per_symbol, summary = backtest.run_backtest({})
+    assert trades.empty and per_symbol.empty
+    assert summary["signals"] == 0 and summary["trades"] == 0
@@ -0,0 +1,22 @@
+# test_feature_store.py
+from feature_store import COLUMNS, EXPIRED_LABEL, FeatureStore
+
+
+def row(timestamp, symbol):
+    values = {"timestamp": timestamp, "symbol": symbol, "direction": "LONG", "price_now": 100.0}
+    return [values.get(column, "") for column in COLUMNS]
+
+
+def test_expired_rows_leave_the_pending_set(tmp_path):
+    store = FeatureStore(str(tmp_path / "ml_log.db"))
+    store.append([row("2026-01-01 00:00:00", "GONEUSDT"), row("2026-01-02 12:00:00", "BTCUSDT"),
+                  row("2026-01-02 12:05:00", "ETHUSDT")])
+    store.set_future_prices([(3, 101.0, 1)])
+
+    assert store.expire(before="2026-01-02 00:00:00") == 1
+    assert store.expire(before="2026-01-02 00:00:00") == 0
+    assert store.pending()["symbol"].tolist() == ["BTCUSDT"]
+    # Abgelaufene Zeilen bleiben ohne future_price und fehlen in den gelabelten Trainingsdaten
+    old = store.range(end="2026-01-02 00:00:00")
+    assert old["label"].tolist() == [EXPIRED_LABEL] and old["future_price"].isna().all()
+    assert store.range(labeled_only=True)["symbol"].tolist() == ["ETHUSDT"]
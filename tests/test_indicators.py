@@ -0,0 +1,69 @@
+# test_indicators.py
+import numpy as np
+import pandas as pd
+import pytest
+from ta.momentum import RSIIndicator
+from ta.trend import EMAIndicator, MACD
+
+from indicators import IndicatorEngine
+
+TOLERANCE = 1e-9
+
+
+@pytest.fixture(scope="module")
+def series():
+    rng = np.random.default_rng(42)
+    n = 500
+    close = pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.01, n))))
+    high = close * (1 + rng.uniform(0, 0.01, n))
+    low = close * (1 - rng.uniform(0, 0.01, n))
+    volume = pd.Series(rng.uniform(1, 100, n))
+    macd = MACD(close)
+    expected = {
+        "rsi": RSIIndicator(close, window=14).rsi(),
+        "ema20": EMAIndicator(close, window=20).ema_indicator(),
+        "ema50": EMAIndicator(close, window=50).ema_indicator(),
+        "macd_line": macd.macd(),
+        "macd_signal": macd.macd_signal(),
+        "atr": (high - low).rolling(14).mean(),
+        "avg_volume": volume.rolling(20).mean(),
+    }
+    candles = np.stack([np.arange(n, dtype=np.float64) * 300_000, close.shift(1).fillna(close[0]).to_numpy(),
+                        high.to_numpy(), low.to_numpy(), close.to_numpy(), volume.to_numpy()])
+    return candles, expected
+
+
+def assert_matches(key, i, got, want):
+    if np.isnan(want):
+        assert np.isnan(got), f"{key}[{i}]: {got} statt NaN"
+    else:
+        assert abs(got - want) <= TOLERANCE * max(1.0, abs(want)), f"{key}[{i}]: {got} != {want}"
+
+
+def test_snapshot_matches_ta(series):
+    candles, expected = series
+    _, _, high, low, close, volume = candles
+    engine = IndicatorEngine()
+    for i in range(candles.shape[1]):
+        values = engine.snapshot(high[i], low[i], close[i], volume[i])
+        for key, want in expected.items():
+            assert_matches(key, i, values[key], want.iloc[i])
+        engine.update(i, high[i], low[i], close[i], volume[i])
+
+
+def test_sync_over_sliding_windows_matches_ta(series):
+    # Wie im Bot: jeder Zyklus liefert die letzten 50 Kerzen, die letzte ist die laufende
+    candles, expected = series
+    engine = IndicatorEngine()
+    for end in range(50, candles.shape[1] + 1):
+        values = engine.sync(candles[:, end - 50:end])
+        for key, want in expected.items():
+            assert_matches(key, end - 1, values[key], want.iloc[end - 1])
+
+
+def test_sync_rebuilds_after_gap(series):
+    candles, _ = series
+    engine = IndicatorEngine()
+    engine.sync(candles[:, :50])
+    after_gap = engine.sync(candles[:, 200:250])
+    assert after_gap == IndicatorEngine().sync(candles[:, 200:250])
@@ -0,0 +1,84 @@
+# test_kline_archive.py
+import os
+
+import numpy as np
+import pytest
+
+import kline_archive
+from candle_store import INTERVAL_MS
+from kline_archive import KlineArchive, ROW_BYTES
+
+STEP = INTERVAL_MS["5m"]
+
+
+def candles(first, n):
+    ts = first + np.arange(n) * STEP
+    return np.column_stack([ts, ts / STEP, ts / STEP + 1, ts / STEP - 1, ts / STEP, np.ones(n)])
+
+
+@pytest.fixture
+def archive(tmp_path):
+    return KlineArchive(str(tmp_path))
+
+
+def test_append_skips_old_and_duplicate_rows(archive):
+    assert archive.append("X", "5m", candles(0, 10)) == 10
+    # Überlappung, Duplikat und falsche Reihenfolge: nur die 5 neuen Kerzen werden angehängt
+    rows = np.concatenate([candles(5 * STEP, 10)[::-1], candles(12 * STEP, 1)])
+    assert archive.append("X", "5m", rows) == 5
+    assert archive.last_timestamp("X", "5m") == 14 * STEP
+    assert np.array_equal(archive.read("X", "5m"), candles(0, 15).T)
+    assert np.array_equal(archive.read("X", "5m", start=3 * STEP, end=6 * STEP)[0], [3 * STEP, 4 * STEP, 5 * STEP])
+    assert archive.symbols("5m") == ["X"]
+
+
+def test_fill_from_since_and_continue(archive, monkeypatch):
+    monkeypatch.setattr(kline_archive, "MAX_REST_CANDLES", 100)
+    source = candles(0, 1000)
+    requests = []
+
+    def fetch(symbol, interval, limit, start_time, end_time):
+        requests.append((limit, start_time, end_time))
+        rows = source[(source[:, 0] >= start_time) & (source[:, 0] <= end_time)]
+        return rows[:limit]
+
+    # Leere Datei: ab since in Blöcken von MAX_REST_CANDLES bis einschliesslich until
+    assert archive.fill("X", "5m", fetch, until=249 * STEP, since=10 * STEP) == 240
+    assert [r[0] for r in requests] == [100, 100, 40]
+    assert archive.check("X", "5m")["first"] == 10 * STEP
+    # Danach ab der letzten gespeicherten Kerze; since wird ignoriert
+    requests.clear()
+    assert archive.fill("X", "5m", fetch, until=259 * STEP, since=0) == 10
+    assert requests == [(10, 250 * STEP, 259 * STEP)]
+    # REST-Fehler bricht ab, ohne etwas zu schreiben
+    assert archive.fill("X", "5m", lambda *args: None, until=300 * STEP) == 0
+    assert archive.fill("Y", "5m", fetch, until=10 * STEP) == 0      # leer und ohne since
+
+
+def test_check_and_repair(archive):
+    archive.append("X", "5m", candles(0, 10))
+    archive.append("X", "5m", candles(15 * STEP, 5))                # Lücke 10..14
+    path = archive.path("X", "5m")
+    with open(path, "ab") as f:
+        f.write(candles(3 * STEP, 1).tobytes())                    # Duplikat, unsortiert
+        f.write(b"\x00" * 10)                                       # angefangene Zeile
+    report = archive.check("X", "5m")
+    assert report["gaps"] == [(10 * STEP, 14 * STEP)] and report["missing"] == 5
+    assert (report["duplicates"], report["unordered"], report["partial_bytes"]) == (0, 1, 10)
+    assert report["rows"] == 16
+
+    # Repair mit den nachgeladenen Kerzen der Lücke: sortiert, ohne Duplikate und Rest-Bytes
+    assert archive.repair("X", "5m", candles(10 * STEP, 5)) == 20
+    report = archive.check("X", "5m")
+    assert (report["gaps"], report["duplicates"], report["unordered"], report["partial_bytes"]) == ([], 0, 0, 0)
+    assert np.array_equal(archive.read("X", "5m"), candles(0, 20).T)
+    assert os.path.getsize(archive.path("X", "5m")) == 20 * ROW_BYTES
+
+
+def test_append_after_partial_row(archive):
+    archive.append("X", "5m", candles(0, 3))
+    with open(archive.path("X", "5m"), "ab") as f:
+        f.write(b"\x01" * 7)
+    assert archive.append("X", "5m", candles(3 * STEP, 2)) == 2
+    assert archive.check("X", "5m")["partial_bytes"] == 0
+    assert np.array_equal(archive.read("X", "5m"), candles(0, 5).T)
@@ -0,0 +1,77 @@
+# test_kline_stream.py
+import json
+import time
+
+import numpy as np
+
+from candle_store import CandleStore, INTERVAL_MS
+from kline_stream import KlineStream, parse_kline_message
+from ws_standin import WebSocketStandIn
+
+STEP = INTERVAL_MS["1m"]
+T0 = 1_700_000_040_000 // STEP * STEP
+
+
+def kline_message(symbol, ts, close, closed=False, combined=True):
+    data = {"e": "kline", "s": symbol, "k": {
+        "t": ts, "i": "1m", "s": symbol, "o": "1.0", "h": "2.0", "l": "0.5",
+        "c": str(close), "v": "10.0", "x": closed}}
+    if combined:
+        data = {"stream": f"{symbol.lower()}@kline_1m", "data": data}
+    return json.dumps(data)
+
+
+def wait_for(condition, timeout=5.0):
+    end = time.time() + timeout
+    while time.time() < end:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_parse_kline_message():
+    assert parse_kline_message(kline_message("BTCUSDT", T0, 1.5, closed=True)) == (
+        "BTCUSDT", "1m", [T0, 1.0, 2.0, 0.5, 1.5, 10.0], True)
+    assert parse_kline_message(kline_message("ETHUSDT", T0, 3, combined=False))[3] is False
+    assert parse_kline_message(json.dumps({"e": "aggTrade"})) is None
+
+
+def test_backfill_and_reconnect():
+    server = WebSocketStandIn()
+    backfills = []
+    closed = []
+
+    def backfill(symbol, interval, limit):
+        backfills.append(symbol)
+        return np.array([[T0 - STEP, 1.0, 1.0, 1.0, 1.0, 1.0], [T0, 1.0, 1.0, 1.0, 1.0, 1.0]])
+
+    store = CandleStore(capacity=10)
+    stream = KlineStream(["BTCUSDT", "ETHUSDT"], "1m", store, backfill, base_url=server.url,
+                         log=lambda msg: None, on_close=lambda s, i, row: closed.append((s, row[0])))
+    try:
+        stream.start()
+        # Backfill beim Start für alle Symbole, eine Verbindung für beide Streams
+        assert backfills == ["BTCUSDT", "ETHUSDT"]
+        assert wait_for(stream.is_live)
+        assert server.paths == ["/stream?streams=btcusdt@kline_1m/ethusdt@kline_1m"]
+
+        server.send(kline_message("BTCUSDT", T0, 1.5))
+        server.send(kline_message("BTCUSDT", T0 + STEP, 1.7))
+        assert wait_for(lambda: store.last_timestamp("BTCUSDT", "1m") == T0 + STEP)
+        assert closed == []
+        server.send(kline_message("BTCUSDT", T0 + STEP, 1.8, closed=True))
+        assert wait_for(lambda: closed == [("BTCUSDT", T0 + STEP)])
+        with store.lock:
+            assert store.window("BTCUSDT", "1m", 3)[4].tolist() == [1.0, 1.5, 1.8]
+
+        # Verbindungsabbruch: neuer Verbindungsaufbau und Backfill für die Symbole der Verbindung
+        server.drop()
+        assert wait_for(lambda: server.connections == 2 and stream.is_live())
+        assert wait_for(lambda: len(backfills) == 4)
+        assert stream.reconnects == 1
+        server.send(kline_message("ETHUSDT", T0 + STEP, 2.5))
+        assert wait_for(lambda: store.last_timestamp("ETHUSDT", "1m") == T0 + STEP)
+    finally:
+        stream.stop()
+        server.stop()
@@ -0,0 +1,36 @@
+# test_ml_predict.py
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import StandardScaler
+
+from ml_predict import FEATURES, ModelServer
+
+
+def test_batch_equals_scaler_and_predict_proba(tmp_path):
+    rng = np.random.default_rng(5)
+    x = rng.normal(size=(400, len(FEATURES)))
+    y = (x[:, 0] + rng.normal(0, 0.5, 400) > 0).astype(int)
+    scaler = StandardScaler().fit(x)
+    model = RandomForestClassifier(n_estimators=20, random_state=0).fit(scaler.transform(x), y)
+    joblib.dump(model, tmp_path / "model.pkl")
+    joblib.dump(scaler, tmp_path / "scaler.pkl")
+
+    server = ModelServer(str(tmp_path / "model.pkl"), str(tmp_path / "scaler.pkl"), log=lambda msg: None)
+    assert server.ready
+    candidates = rng.normal(size=(25, len(FEATURES)))
+    predictions, probs = server.predict_batch(candidates)
+    expected = model.predict_proba(scaler.transform(candidates))
+    assert np.array_equal(probs, expected[:, 1])
+    assert np.array_equal(predictions, model.predict(scaler.transform(candidates)))
+
+    # Einzelbewertung mit Feature-Dict wie aus analyze_symbol
+    prediction, prob = server.predict(dict(zip(FEATURES, candidates[3])))
+    assert (prediction, prob) == (int(predictions[3]), float(probs[3]))
+    assert server.stats()["predictions"] == 26 and server.stats()["batches"] == 2
+
+
+def test_missing_model(tmp_path):
+    server = ModelServer(str(tmp_path / "model.pkl"), str(tmp_path / "scaler.pkl"), log=lambda msg: None)
+    assert not server.ready
+    assert server.predict_batch(np.zeros((1, len(FEATURES)))) is None
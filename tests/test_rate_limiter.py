@@ -0,0 +1,32 @@
+# test_rate_limiter.py
+import threading
+import time
+
+from rate_limiter import WeightGovernor, SCAN, BACKFILL
+
+
+def test_backfill_stays_under_its_budget():
+    governor = WeightGovernor(budget=100, order_reserve=20, window=3600, backfill_budget=30)
+    for _ in range(30):
+        governor.acquire(1, BACKFILL)
+    done = threading.Event()
+    threading.Thread(target=lambda: (governor.acquire(1, BACKFILL), done.set()), daemon=True).start()
+    assert not done.wait(0.2)
+    # Der Scan darf den Rest des Budgets weiter nutzen
+    for _ in range(50):
+        governor.acquire(1, SCAN)
+    assert governor.used == 80
+
+
+def test_backfill_waits_for_scan():
+    governor = WeightGovernor(budget=100, order_reserve=20, window=3600, backfill_budget=100)
+    governor.banned_until = time.time() + 0.3
+    order = []
+    scan = threading.Thread(target=lambda: (governor.acquire(1, SCAN), order.append("scan")))
+    backfill = threading.Thread(target=lambda: (governor.acquire(1, BACKFILL), order.append("backfill")))
+    backfill.start()
+    time.sleep(0.05)
+    scan.start()
+    scan.join(2)
+    backfill.join(2)
+    assert order == ["scan", "backfill"]
@@ -0,0 +1,86 @@
+# test_scheduler.py
+import threading
+
+from scheduler import CycleScheduler
+
+
+class FakeClock:
+    def __init__(self, now=0.0):
+        self.now = now
+        self.callers = []
+
+    def __call__(self):
+        self.callers.append(threading.current_thread().name)
+        return self.now
+
+
+def join_all(scheduler):
+    for thread in list(scheduler._running.values()):
+        thread.join(5)
+
+
+def test_same_boundary_starts_in_priority_order():
+    clock = FakeClock(60.0)
+    scheduler = CycleScheduler(log=lambda msg: None, clock=clock)
+    release = threading.Event()
+    for name, priority in (("labels", 2), ("monitor", 0), ("scan", 1)):
+        job = scheduler.add(name, release.wait, 60, priority=priority)
+        job.next_run = 60.0
+    scheduler.dispatch(60.0)
+    starts = list(clock.callers)
+    release.set()
+    join_all(scheduler)
+    assert starts == ["job-monitor", "job-scan", "job-labels"]
+    assert all(job.next_run == 120.0 for job in scheduler.jobs)
+
+
+def test_overrun_skips_exactly_one_boundary():
+    clock = FakeClock(60.0)
+    scheduler = CycleScheduler(log=lambda msg: None, clock=clock)
+    release = threading.Event()
+
+    def slow():
+        release.wait(5)
+        clock.now = 130.0      # 70 s > Deadline 55 s
+
+    job = scheduler.add("scan", slow, 60, deadline=55)
+    job.next_run = 60.0
+    scheduler.dispatch(60.0)
+    clock.now = 120.0
+    scheduler.dispatch(120.0)      # läuft noch → übersprungen, das ist der eine ausgelassene Termin
+    release.set()
+    join_all(scheduler)
+    assert (job.runs, job.overruns, job.skipped, job.skip_next) == (1, 1, 1, False)
+
+    job.func = lambda: None
+    clock.now = 180.0
+    scheduler.dispatch(180.0)
+    join_all(scheduler)
+    assert (job.runs, job.skipped, job.next_run) == (2, 1, 240.0)
+
+
+def test_overrun_within_interval_skips_next_boundary():
+    clock = FakeClock(60.0)
+    scheduler = CycleScheduler(log=lambda msg: None, clock=clock)
+
+    def slow():
+        clock.now = 118.0      # 58 s: vor dem nächsten Termin fertig, aber über der Deadline
+
+    job = scheduler.add("scan", slow, 60, deadline=55)
+    job.next_run = 60.0
+    scheduler.dispatch(60.0)
+    join_all(scheduler)
+    assert job.skip_next
+    scheduler.dispatch(120.0)
+    assert (job.runs, job.skipped, job.skip_next) == (1, 1, False)
+    job.func = lambda: None
+    scheduler.dispatch(180.0)
+    join_all(scheduler)
+    assert (job.runs, job.skipped) == (2, 1)
+
+
+def test_default_deadline_is_interval_minus_offset():
+    scheduler = CycleScheduler(log=lambda msg: None)
+    assert scheduler.add("scan", lambda: None, 300, offset=2).deadline == 298
+    assert scheduler.add("monitor", lambda: None, 60).deadline == 60
+    assert scheduler.add("fast", lambda: None, 60, offset=2, deadline=30).deadline == 30
@@ -0,0 +1,84 @@
+# test_screener.py
+import numpy as np
+import pytest
+
+import screener
+from indicators import IndicatorEngine
+from signal_rules import check_criteria, describe_criteria
+
+SYMBOLS, BARS, CYCLES = 100, 50, 40
+
+
+@pytest.fixture(scope="module")
+def history():
+    rng = np.random.default_rng(11)
+    total = BARS + CYCLES - 1
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (SYMBOLS, total)), axis=1))
+    return np.stack([
+        np.tile(np.arange(total, dtype=np.float64) * 300_000, (SYMBOLS, 1)),
+        close * (1 + rng.normal(0, 0.002, (SYMBOLS, total))),
+        close * (1 + rng.uniform(0, 0.01, (SYMBOLS, total))),
+        close * (1 - rng.uniform(0, 0.01, (SYMBOLS, total))),
+        close,
+        rng.uniform(1, 100, (SYMBOLS, total)),
+    ])
+
+
+def assert_same(values, failed, engines, candles):
+    for i, engine in enumerate(engines):
+        single = engine.sync(candles[:, i, :])
+        for key, value in single.items():
+            assert value == values[key][i] or (np.isnan(value) and np.isnan(values[key][i])), key
+        for direction in ("long", "short"):
+            flags = tuple(mask[i] for mask in failed[direction])
+            expected = check_criteria(direction, single["rsi"], single["ema20"], single["ema50"],
+                                      single["macd_line"], single["macd_signal"])
+            assert describe_criteria(direction, flags, values["rsi"][i]) == expected
+
+
+def test_matches_warmed_up_engines(history):
+    # Wie im Bot: pro Zyklus das nächste 50er-Fenster, Zustand läuft über alle Zyklen weiter
+    state = screener.ScreenerState()
+    names = [f"SYM{i}" for i in range(SYMBOLS)]
+    engines = [IndicatorEngine() for _ in range(SYMBOLS)]
+    for cycle in range(CYCLES):
+        candles = history[:, :, cycle:cycle + BARS]
+        values, failed, _ = screener.screen(candles, state, names)
+        assert_same(values, failed, engines, candles)
+
+
+def test_same_window_twice_and_symbol_order(history):
+    # Laufende Kerze ändert sich, abgeschlossene bleiben; Reihenfolge der Symbole beliebig
+    state = screener.ScreenerState()
+    names = [f"SYM{i}" for i in range(SYMBOLS)]
+    engines = [IndicatorEngine() for _ in range(SYMBOLS)]
+    candles = history[:, :, :BARS]
+    screener.screen(candles, state, names)
+    for engine, i in zip(engines, range(SYMBOLS)):
+        engine.sync(candles[:, i, :])
+
+    order = np.arange(SYMBOLS)[::-1]
+    later = history[:, order, 3:3 + BARS].copy()
+    later[4, :, -1] *= 1.01
+    values, failed, _ = screener.screen(later, state, [names[i] for i in order])
+    assert_same(values, failed, [engines[i] for i in order], later)
+
+
+def test_gap_and_new_symbols(history):
+    state = screener.ScreenerState()
+    engines = [IndicatorEngine() for _ in range(3)]
+    screener.screen(history[:, :2, :BARS], state, ["A", "B"])
+    for i in range(2):
+        engines[i].sync(history[:, i, :BARS])
+    # A springt über eine Lücke (Neuaufbau), B läuft normal weiter, C ist neu
+    after_gap = history[:, 0, CYCLES - 1:].copy()
+    after_gap[0] += 1000 * 300_000
+    candles = np.stack([after_gap, history[:, 1, 1:BARS + 1], history[:, 2, :BARS]], axis=1)
+    values, failed, _ = screener.screen(candles, state, ["A", "B", "C"])
+    assert_same(values, failed, engines, candles)
+
+
+def test_stateless_screen_equals_fresh_engine(history):
+    candles = history[:, :, :BARS]
+    values, failed, _ = screener.screen(candles)
+    assert_same(values, failed, [IndicatorEngine() for _ in range(SYMBOLS)], candles)
@@ -0,0 +1,27 @@
+# test_signal_rules.py
+import numpy as np
+
+from signal_rules import criteria_masks, is_near_trigger, near_masks
+
+
+def flags(direction, rsi, ema20=101.0, ema50=100.0, macd_line=0.1, macd_signal=0.0, price=100.0):
+    args = (rsi, ema20, ema50, macd_line, macd_signal)
+    return criteria_masks(direction, *args), near_masks(direction, *args, price)
+
+
+def test_near_means_one_criterion_missed_by_a_small_margin():
+    assert is_near_trigger(*flags("long", rsi=35.0))            # RSI 2 Punkte über 33
+    assert not is_near_trigger(*flags("long", rsi=55.0))        # RSI weit weg
+    assert not is_near_trigger(*flags("long", rsi=30.0))        # alles erfüllt → Signal, nicht knapp
+    # Zwei verfehlte Kriterien zählen nie als knapp
+    assert not is_near_trigger(*flags("long", rsi=35.0, macd_line=-0.001))
+    # MACD knapp unter der Signallinie (0.001 < 0.02 % von 100), RSI erfüllt
+    assert is_near_trigger(*flags("long", rsi=30.0, macd_line=-0.001))
+    assert is_near_trigger(*flags("short", rsi=65.0, ema20=99.0, macd_line=-0.1))
+
+
+def test_masks_work_on_arrays():
+    rsi = np.array([35.0, 55.0, 30.0])
+    ones = np.ones(3)
+    failed, near = flags("long", rsi, 101.0 * ones, 100.0 * ones, 0.1 * ones, 0.0 * ones, 100.0 * ones)
+    assert [is_near_trigger([f[i] for f in failed], [n[i] for n in near]) for i in range(3)] == [True, False, False]
@@ -0,0 +1,91 @@
+# ws_standin.py
+import base64
+import hashlib
+import socket
+import struct
+import threading
+
+GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+
+class WebSocketStandIn:
+    """
+    Minimaler lokaler WebSocket-Server für Tests von KlineStream: nimmt Verbindungen an,
+    merkt sich die angefragten Pfade, schickt Textnachrichten an alle offenen Verbindungen
+    und kann sie hart trennen (wie ein Abbruch durch Binance).
+    """
+
+    def __init__(self):
+        self.paths = []
+        self._clients = []
+        self._lock = threading.Lock()
+        self._server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._server.bind(("127.0.0.1", 0))
+        self._server.listen()
+        self.url = f"ws://127.0.0.1:{self._server.getsockname()[1]}"
+        self._running = True
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    @property
+    def connections(self):
+        return len(self.paths)
+
+    def _accept(self):
+        while self._running:
+            try:
+                conn, _ = self._server.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._handshake, args=(conn,), daemon=True).start()
+
+    def _handshake(self, conn):
+        request = b""
+        while b"\r\n\r\n" not in request:
+            chunk = conn.recv(4096)
+            if not chunk:
+                conn.close()
+                return
+            request += chunk
+        lines = request.decode().split("\r\n")
+        headers = {k.strip().lower(): v.strip() for k, _, v in (line.partition(":") for line in lines[1:] if line)}
+        accept = base64.b64encode(hashlib.sha1((headers["sec-websocket-key"] + GUID).encode()).digest()).decode()
+        conn.sendall(("HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                      f"Sec-WebSocket-Accept: {accept}\r\n\r\n").encode())
+        with self._lock:
+            self.paths.append(lines[0].split(" ")[1])
+            self._clients.append(conn)
+        # Client-Frames (Pong, Close) werden gelesen und verworfen
+        try:
+            while conn.recv(4096):
+                pass
+        except OSError:
+            pass
+
+    def send(self, text):
+        payload = text.encode()
+        if len(payload) < 126:
+            header = struct.pack("!BB", 0x81, len(payload))
+        elif len(payload) < 65536:
+            header = struct.pack("!BBH", 0x81, 126, len(payload))
+        else:
+            header = struct.pack("!BBQ", 0x81, 127, len(payload))
+        with self._lock:
+            for conn in self._clients:
+                conn.sendall(header + payload)
+
+    def drop(self):
+        # Verbindungen ohne Close-Frame schliessen
+        with self._lock:
+            clients, self._clients = self._clients, []
+        for conn in clients:
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            conn.close()
+
+    def stop(self):
+        self._running = False
+        self.drop()
+        self._server.close()
@@ -1,101 +1,146 @@
 # train_model.py
-import pandas as pd
+import json
+import os
+import shutil
+import time
+from datetime import datetime, timedelta
+
 import joblib
+import numpy as np
+import pandas as pd
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.preprocessing import StandardScaler
-from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report
-
-# === Spaltennamen exakt an CSV-Datei anpassen ===
-#columns = [
-    #"timestamp", "symbol", "direction", "score", "entry_price", "current_price", "price_diff",
-    #"btc_strength", "atr", "market_phase", "rsi", "macd", "ema20", "ema50",
-    #"volume_ratio", "future_price"
-#]
-
-columns = [
-  "timestamp", "symbol", "direction", "rsi", "ema20", "ema50", "macd", "volume_ratio",
-  "atr", "market_trend", "btc_strength", "weekday", "hour", "price_now", "future_price", "label"
-]
-
-df = pd.read_csv("ml_log.csv", header=None, names=columns)
-
-print(df.head(3).to_string())
-print(f"🔢 Ursprüngliche Zeilen: {len(df)}")
-
-# === Spalten in float konvertieren ===
-cols_to_float = [
-    "rsi", "ema20", "ema50", "macd", "volume_ratio",
-    "atr", "btc_strength", "future_price"
-]
-for col in cols_to_float:
-    df[col] = pd.to_numeric(df[col], errors="coerce")
-
-# === Timestamp-Spalten konvertieren ===
-df["timestamp"] = pd.to_datetime(df["timestamp"], errors="coerce")
-df["weekday"] = df["timestamp"].dt.weekday
-df["hour"] = df["timestamp"].dt.hour
-
-# === Nur Zeilen mit gültigen future_price verwenden ===
-df = df[df["future_price"].notna()]
-
-# === Label-Berechnung mit current_price (anstatt price_now) ===
-def calculate_label(row):
-    if row["direction"] == "LONG" and row["future_price"] >= row["price_now"] * 1.002:              #"current_price" stand 29.05 15:00
-        return 1
-    elif row["direction"] == "SHORT" and row["future_price"] <= row["price_now"] * 0.998:           #"current_price" stand 29.05 15:00
-        return 1
-    else:
-        return 0
-
-df["label"] = df.apply(calculate_label, axis=1)
-
-import os
-
-# === NaNs entfernen ===
-df.dropna(inplace=True)
-print(f"🩼 Nach dropna(): {len(df)}")
-
-if len(df) == 0:
-    print("❌ Fehler: Keine Daten nach dropna(). Möglicherweise falsche oder leere ml_log.csv geladen.")
-    print("📂 Geladener Pfad:", os.path.abspath("ml_log.csv"))
-    print("📄 Vorschau auf letzte 3 Zeilen der Datei:")
-    raw = pd.read_csv("ml_log.csv", header=None)
-    print(raw.tail(3).to_string())
-    exit()
-
-print(f"🏷️ Final für Training verwendbare Zeilen: {len(df)}")
-
-# === Feature-Engineering ===
-df["ema_diff"] = df["ema20"] - df["ema50"]
-df["macd_abs"] = df["macd"].abs()
-
-
-X = df[[  # exakt dieselben 8 Features wie im ml_predict.py
-    "rsi", "ema_diff", "macd_abs", "volume_ratio",
-    "atr", "btc_strength", "weekday", "hour"
-]]
-y = df["label"]
-
-
-# === Skalierung & Split ===
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-
-scaler = StandardScaler()
-X_train_scaled = scaler.fit_transform(X_train)
-X_test_scaled = scaler.transform(X_test)
-
-# === Modell trainieren ===
-model = RandomForestClassifier(n_estimators=100, random_state=42)
-model.fit(X_train_scaled, y_train)
-
-# === Modell & Scaler speichern ===
-joblib.dump(model, "ml_model.pkl")
-joblib.dump(scaler, "ml_scaler.pkl")
-
-# === Evaluation ===
-y_pred = model.predict(X_test_scaled)
-print(classification_report(y_test, y_pred))
-
-
-
+from feature_store import FeatureStore, label_rows
+from ml_predict import FEATURES, MODEL_PATH, SCALER_PATH
+
+try:
+    import resource     # nur Unix – Spitzen-RSS für die Metadaten
+except ImportError:
+    resource = None
+
+# === Konfiguration ===
+TRAIN_WINDOW_DAYS = float(os.getenv("TRAIN_WINDOW_DAYS", "0"))   # 0 = gesamte Historie
+TEST_FRACTION = float(os.getenv("TEST_FRACTION", "0.2"))         # jüngster Anteil als Testmenge
+N_ESTIMATORS = int(os.getenv("N_ESTIMATORS", "100"))
+ARTIFACT_DIR = os.getenv("ML_ARTIFACT_DIR", "models")
+
+# Nur diese Spalten werden aus dem FeatureStore gelesen
+SOURCE_COLUMNS = ["timestamp", "direction", "rsi", "ema20", "ema50", "macd", "volume_ratio",
+                  "atr", "btc_strength", "price_now", "future_price"]
+
+
+def load_data(store, window_days=TRAIN_WINDOW_DAYS):
+    """
+    Typisierte, gelabelte Zeilen aus dem FeatureStore – optional nur die letzten `window_days` Tage.
+    """
+    start = None
+    if window_days > 0:
+        start = (datetime.now() - timedelta(days=window_days)).strftime("%Y-%m-%d %H:%M:%S")
+    return store.range(start=start, labeled_only=True, columns=SOURCE_COLUMNS)
+
+
+def build_dataset(df):
+    """
+    Labels und Features vektorisiert; Zeilen mit fehlenden Werten fallen weg.
+    Rückgabe: (X, y, timestamps), zeitlich sortiert.
+    """
+    df = df.copy()
+    df["timestamp"] = pd.to_datetime(df["timestamp"], errors="coerce")
+    df["weekday"] = df["timestamp"].dt.weekday
+    df["hour"] = df["timestamp"].dt.hour
+    df["ema_diff"] = df["ema20"] - df["ema50"]
+    df["macd_abs"] = df["macd"].abs()
+    df = df.dropna(subset=FEATURES + ["timestamp", "price_now", "future_price"]).sort_values("timestamp")
+    y = label_rows(df["direction"], df["price_now"], df["future_price"])
+    return df[FEATURES].to_numpy(dtype=np.float64), y, df["timestamp"].to_numpy()
+
+
+def time_split(X, y, test_fraction=TEST_FRACTION):
+    # Älteste Zeilen trainieren, jüngste testen – kein Blick in die Zukunft
+    cut = int(len(X) * (1 - test_fraction))
+    return X[:cut], X[cut:], y[:cut], y[cut:]
+
+
+def peak_memory_mb():
+    if resource is None:
+        return None
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)  # Linux: KB
+
+
+def train(X_train, y_train, n_estimators=N_ESTIMATORS):
+    scaler = StandardScaler()
+    X_train_scaled = scaler.fit_transform(X_train)
+    model = RandomForestClassifier(n_estimators=n_estimators, random_state=42, n_jobs=-1)
+    model.fit(X_train_scaled, y_train)
+    return model, scaler
+
+
+def save_artifacts(model, scaler, meta, artifact_dir=ARTIFACT_DIR):
+    """
+    Speichert Modell, Scaler und Metadaten versioniert unter artifact_dir/<version>/ und
+    ersetzt danach ml_model.pkl/ml_scaler.pkl atomar (→ Hot-Reload im laufenden Bot).
+    """
+    path = os.path.join(artifact_dir, meta["version"])
+    os.makedirs(path, exist_ok=True)
+    joblib.dump(model, os.path.join(path, "ml_model.pkl"))
+    joblib.dump(scaler, os.path.join(path, "ml_scaler.pkl"))
+    with open(os.path.join(path, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+
+    # Erst den Scaler, dann das Modell – der ModelServer lädt beide, sobald sich eine mtime ändert
+    for name, target in (("ml_scaler.pkl", SCALER_PATH), ("ml_model.pkl", MODEL_PATH)):
+        shutil.copyfile(os.path.join(path, name), target + ".tmp")
+        os.replace(target + ".tmp", target)
+    return path
+
+
+def main():
+    store = FeatureStore()
+    load_start = time.perf_counter()
+    df = load_data(store)
+    load_seconds = time.perf_counter() - load_start
+    print(f"🔢 Gelabelte Zeilen geladen: {len(df)} ({load_seconds:.2f}s)")
+
+    X, y, timestamps = build_dataset(df)
+    print(f"🏷️ Final für Training verwendbare Zeilen: {len(X)}")
+    if len(X) < 10 or len(np.unique(y)) < 2:
+        print("❌ Fehler: Zu wenige Daten oder nur eine Klasse. Möglicherweise falsches oder leeres ML-Log.")
+        print("📂 Geladener Pfad:", os.path.abspath(store.path))
+        print("📄 Vorschau auf die letzten 3 Zeilen:")
+        print(store.recent(3).to_string())
+        return
+
+    X_train, X_test, y_train, y_test = time_split(X, y)
+
+    fit_start = time.perf_counter()
+    model, scaler = train(X_train, y_train)
+    fit_seconds = time.perf_counter() - fit_start
+
+    y_pred = model.predict(scaler.transform(X_test)) if len(X_test) else []
+    print(classification_report(y_test, y_pred, zero_division=0) if len(X_test) else "ℹ️ Keine Testmenge")
+
+    meta = {
+        "version": datetime.now().strftime("%Y%m%d_%H%M%S"),
+        "features": FEATURES,
+        "rows_train": int(len(X_train)),
+        "rows_test": int(len(X_test)),
+        "positive_rate": round(float(y.mean()), 4),
+        "data_from": str(timestamps[0]),
+        "data_to": str(timestamps[-1]),
+        "test_from": str(timestamps[len(X_train)]) if len(X_test) else None,
+        "window_days": TRAIN_WINDOW_DAYS,
+        "n_estimators": N_ESTIMATORS,
+        "test_accuracy": round(float((y_pred == y_test).mean()), 4) if len(X_test) else None,
+        "load_seconds": round(load_seconds, 3),
+        "fit_seconds": round(fit_seconds, 3),
+        "dataset_mb": round(X.nbytes / 1024 ** 2, 3),
+        "peak_rss_mb": peak_memory_mb(),
+    }
+    path = save_artifacts(model, scaler, meta)
+    print(f"✅ Modell {meta['version']} gespeichert unter {path} "
+          f"(Training {fit_seconds:.2f}s, Peak-RSS {meta['peak_rss_mb']} MB)")
+
+
+if __name__ == "__main__":
+    main()